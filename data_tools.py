@@ -2,12 +2,22 @@
 데이터 준비 도구 모음
 """
 import os
+import io
+import sys
+import re
+import csv
+import json
 import shutil
 import random
+import hashlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from dataset_index import CLASS_LABELS, IMAGE_EXTENSIONS, DatasetIndex, file_hash
+
 def setup_data_structure():
     """데이터 폴더 구조 자동 생성"""
     print("📁 데이터 폴더 구조 생성 중...")
@@ -35,7 +45,7 @@ def setup_data_structure():
 
 ## 📸 이미지 추가 방법
 1. raw/ 폴더에 원본 이미지 저장
-2. split_data_automatically() 함수로 자동 분할
+2. python data_tools.py split 으로 자동 분할 (새 파일만 추가 배치)
 3. python src/train_model.py로 훈련 시작
 
 ## 🎯 클래스별 설명
@@ -48,32 +58,28 @@ def setup_data_structure():
     
     print("📋 data/README.md 생성 완료")
 
-def check_data_status():
-    """현재 데이터 상태 확인"""
+def check_data_status(data_dir="data"):
+    """현재 데이터 상태 확인 (데이터셋 인덱스 사용, 바뀐 디렉토리만 다시 스캔)"""
     print("=== 📊 데이터 상태 확인 ===")
     
-    paths = {
-        "훈련용 외국인등록증 뒷면": "data/train/foreigner_card_back",
-        "훈련용 기타 문서": "data/train/other_documents",
-        "검증용 외국인등록증 뒷면": "data/validation/foreigner_card_back", 
-        "검증용 기타 문서": "data/validation/other_documents"
+    descriptions = {
+        ("train", 1): "훈련용 외국인등록증 뒷면",
+        ("train", 0): "훈련용 기타 문서",
+        ("validation", 1): "검증용 외국인등록증 뒷면",
+        ("validation", 0): "검증용 기타 문서"
     }
     
-    total_train = 0
-    total_val = 0
+    totals = {"train": 0, "validation": 0}
+    with DatasetIndex(data_dir) as index:
+        index.update()
+        for split in totals:
+            counts = index.class_counts(split)
+            for label in (1, 0):
+                print(f"{descriptions[(split, label)]}: {counts[label]}장")
+            totals[split] = sum(counts.values())
     
-    for desc, path in paths.items():
-        if os.path.exists(path):
-            count = len([f for f in os.listdir(path) 
-                        if f.lower().endswith(('.jpg', '.jpeg', '.png'))])
-            print(f"{desc}: {count}장")
-            
-            if "훈련용" in desc:
-                total_train += count
-            else:
-                total_val += count
-        else:
-            print(f"{desc}: 폴더 없음")
+    total_train = totals["train"]
+    total_val = totals["validation"]
     
     print(f"\n📈 총계:")
     print(f"  훈련 데이터: {total_train}장")
@@ -90,112 +96,241 @@ def check_data_status():
     
     return total_train, total_val
 
-def split_data_automatically(source_dir="data/raw", train_ratio=0.8):
-    """원본 데이터를 훈련/검증으로 자동 분할"""
-    print(f"🔄 데이터 자동 분할 시작 (훈련:{train_ratio*100:.0f}% / 검증:{(1-train_ratio)*100:.0f}%)")
+SPLIT_MANIFEST_FIELDS = ["source", "class", "split", "target", "group"]
+LINK_MODES = ("hardlink", "symlink", "copy")
+
+def _split_fraction(key, seed):
+    """키와 시드로 정해지는 [0, 1) 값 (파일이 추가돼도 기존 파일의 분할이 바뀌지 않음)"""
+    digest = hashlib.sha1(f"{seed}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+def _group_key(file_name, group_pattern):
+    """그룹 정규식에 맞는 부분(첫 번째 캡처 그룹 우선)을 그룹 키로 사용, 맞지 않으면 파일 이름"""
+    if group_pattern:
+        match = group_pattern.search(file_name)
+        if match:
+            return match.group(1) if match.groups() else match.group(0)
+    return file_name
+
+def _place_file(source, target, link_mode):
+    """하드링크/심볼릭 링크로 배치하고, 불가능하면(다른 파일 시스템 등) 복사"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists() or target.is_symlink():
+        target.unlink()
     
-    # 원본 경로
-    source_foreigner = Path(source_dir) / "foreigner_card_back"
-    source_other = Path(source_dir) / "other_documents"
+    if link_mode == "hardlink":
+        try:
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+    elif link_mode == "symlink":
+        try:
+            os.symlink(source.resolve(), target)
+            return "symlink"
+        except OSError:
+            pass
     
-    # 목표 경로
-    targets = {
-        "train_foreigner": Path("data/train/foreigner_card_back"),
-        "train_other": Path("data/train/other_documents"),
-        "val_foreigner": Path("data/validation/foreigner_card_back"),
-        "val_other": Path("data/validation/other_documents")
-    }
+    shutil.copy2(source, target)
+    return "copy"
+
+def _load_split_manifest(manifest_path):
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        return {row["source"]: row for row in csv.DictReader(f)}
+
+def split_dataset(source_dir="data/raw", data_dir="data", train_ratio=0.8, seed=42,
+                  link_mode="hardlink", group_pattern=None, groups=None, num_workers=None,
+                  manifest_path=None):
+    """
+    원본 데이터를 훈련/검증으로 분할 (비대화형, 재실행 시 새 파일만 처리)
+    - 분할은 (시드, 그룹 키) 해시로 결정되므로 클래스별 비율이 유지되고 같은 그룹은 같은 쪽에 배치됨
+    - group_pattern: 파일 이름에서 그룹 키를 뽑는 정규식 (예: 같은 카드의 여러 촬영본)
+    - groups: {원본 경로: 그룹 키} (지정 시 group_pattern보다 우선, 클래스와 무관하게 같은 키는 같은 분할)
+    - 결과는 manifest CSV(기본 data/split_manifest.csv)에 기록
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"지원하지 않는 배치 방식: {link_mode}")
     
-    # 기존 데이터 정리 (선택사항)
-    response = input("기존 train/validation 데이터를 삭제하고 새로 분할하시겠습니까? (y/n): ")
-    if response.lower() == 'y':
-        for target in targets.values():
-            if target.exists():
-                shutil.rmtree(target)
-                target.mkdir(parents=True)
-    
-    # 폴더 생성
-    for target in targets.values():
-        target.mkdir(parents=True, exist_ok=True)
-    
-    # 외국인등록증 뒷면 분할
-    if source_foreigner.exists():
-        images = []
-        for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
-            images.extend(list(source_foreigner.glob(ext)))
-        
-        random.shuffle(images)
-        split_point = int(len(images) * train_ratio)
-        
-        print(f"📁 외국인등록증 뒷면: {len(images)}장")
-        print(f"  → 훈련용: {split_point}장")
-        print(f"  → 검증용: {len(images) - split_point}장")
-        
-        for i, img in enumerate(images):
-            if i < split_point:
-                shutil.copy2(img, targets["train_foreigner"])
-            else:
-                shutil.copy2(img, targets["val_foreigner"])
+    print(f"🔄 데이터 분할 시작 (훈련:{train_ratio*100:.0f}% / 검증:{(1-train_ratio)*100:.0f}%, {link_mode})")
     
-    # 기타 문서 분할
-    if source_other.exists():
-        images = []
-        for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
-            images.extend(list(source_other.glob(ext)))
-        
-        random.shuffle(images)
-        split_point = int(len(images) * train_ratio)
-        
-        print(f"📁 기타 문서: {len(images)}장")
-        print(f"  → 훈련용: {split_point}장")
-        print(f"  → 검증용: {len(images) - split_point}장")
+    source_dir = Path(source_dir)
+    data_dir = Path(data_dir)
+    manifest_path = Path(manifest_path) if manifest_path else data_dir / "split_manifest.csv"
+    pattern = re.compile(group_pattern) if group_pattern else None
+    groups = groups or {}
+    
+    previous = _load_split_manifest(manifest_path)
+    entries = {}
+    pending = []
+    excluded = 0
+    
+    # validate --quarantine_dir로 격리된 파일 (원본이 바뀌지 않았으면 다시 배치하지 않음)
+    with DatasetIndex(data_dir) as index:
+        quarantined = {os.path.normpath(path): stat for path, stat in index.quarantined().items()}
+    
+    for class_dir in CLASS_LABELS:
+        class_path = source_dir / class_dir
+        if not class_path.exists():
+            continue
         
-        for i, img in enumerate(images):
-            if i < split_point:
-                shutil.copy2(img, targets["train_other"])
+        counts = {"train": 0, "validation": 0}
+        for img_path in sorted(class_path.iterdir()):
+            if img_path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            
+            source = str(img_path)
+            if source in groups:
+                # 중복 클러스터 등 명시적 그룹은 클래스와 무관하게 그룹 키만으로 분할
+                # (클래스 폴더를 넘나드는 클러스터도 한쪽 분할에만 들어가도록)
+                group = groups[source]
+                split_key = group
             else:
-                shutil.copy2(img, targets["val_other"])
+                # 파일 이름/정규식 그룹은 클래스별로 따로 분할해 클래스별 비율 유지
+                group = _group_key(img_path.name, pattern)
+                split_key = f"{class_dir}/{group}"
+            split = "train" if _split_fraction(split_key, seed) < train_ratio else "validation"
+            target = data_dir / split / class_dir / img_path.name
+            
+            stat = img_path.stat()
+            if quarantined.get(os.path.normpath(target)) == (stat.st_size, stat.st_mtime_ns):
+                excluded += 1
+                continue
+            
+            entry = {"source": source, "class": class_dir, "split": split, "target": str(target), "group": group}
+            entries[source] = entry
+            counts[split] += 1
+            
+            # 이미 같은 위치에 배치되고 원본이 바뀌지 않은 파일은 건너뜀 (copy2/링크는 mtime이 같음)
+            old = previous.get(source)
+            if (old and old["target"] == entry["target"] and target.exists()
+                    and target.stat().st_mtime_ns == stat.st_mtime_ns):
+                continue
+            if old and old["target"] != entry["target"]:
+                Path(old["target"]).unlink(missing_ok=True)
+            pending.append((img_path, target))
+        
+        print(f"📁 {class_dir}: 훈련 {counts['train']}장 / 검증 {counts['validation']}장")
+    
+    # 원본에서 사라진 파일의 배치본 정리 (manifest에 기록된 파일만 삭제)
+    removed = [row for source, row in previous.items() if source not in entries]
+    for row in removed:
+        Path(row["target"]).unlink(missing_ok=True)
+    
+    placed = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=num_workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+            for method in executor.map(lambda item: _place_file(item[0], item[1], link_mode), pending):
+                placed[method] = placed.get(method, 0) + 1
     
-    print("✅ 데이터 분할 완료!")
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SPLIT_MANIFEST_FIELDS)
+        writer.writeheader()
+        writer.writerows(entries.values())
+    
+    print(f"  새로 배치: {len(pending)}장 {placed}, 유지: {len(entries) - len(pending)}장, 삭제: {len(removed)}장")
+    if excluded:
+        print(f"  🚫 격리된 손상 파일 제외: {excluded}장")
+    print(f"✅ 데이터 분할 완료! (manifest: {manifest_path})")
+    return entries
 
-def validate_images(data_dir="data"):
-    """이미지 파일 유효성 검사"""
-    print("🔍 이미지 파일 유효성 검사...")
+def split_data_automatically(source_dir="data/raw", train_ratio=0.8, seed=42, link_mode="hardlink"):
+    """원본 데이터를 훈련/검증으로 자동 분할 (split_dataset 래퍼)"""
+    return split_dataset(source_dir=source_dir, train_ratio=train_ratio, seed=seed, link_mode=link_mode)
+
+def _init_validator():
+    """검증 워커 초기화 (프로세스마다 TensorFlow 한 번만 로드, 코어는 프로세스끼리 나눠 씀)"""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def _validate_image(img_path):
+    """훈련과 같은 TensorFlow 디코더로 전체 디코딩해 크기, 채널, EXIF 방향, 디코딩 시간 기록"""
+    import time
+    import tensorflow as tf
     
-    paths = [
-        "train/foreigner_card_back",
-        "train/other_documents",
-        "validation/foreigner_card_back", 
-        "validation/other_documents"
-    ]
+    result = {"path": img_path, "width": None, "height": None, "channels": None,
+              "orientation": None, "decode_ms": None, "valid": 0, "error": None}
+    try:
+        data = tf.io.read_file(img_path)
+        start = time.perf_counter()
+        image = tf.io.decode_image(data, expand_animations=False)
+        result["decode_ms"] = (time.perf_counter() - start) * 1000.0
+        result["height"], result["width"], result["channels"] = (int(d) for d in image.shape)
+        result["valid"] = 1
+    except Exception as e:
+        result["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        return result
     
-    corrupted_files = []
-    small_images = []
+    try:
+        with Image.open(img_path) as img:
+            result["orientation"] = img.getexif().get(0x0112)  # EXIF Orientation 태그
+    except Exception:
+        pass
+    return result
+
+def validate_images(data_dir="data", num_workers=None, quarantine_dir=None, revalidate=False, min_size=200):
+    """
+    이미지 파일 유효성 검사 (프로세스 풀에서 전체 디코딩)
+    - 결과는 데이터셋 인덱스에 기록되고, 손상 파일은 DataLoader 파일 목록에서 제외됨
+    - 새 파일이나 크기/수정 시각이 바뀐 파일만 검사 (제자리 덮어쓰기 포함, revalidate=True면 전체)
+    - quarantine_dir 지정 시 손상 파일을 해당 디렉토리로 이동
+    """
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
     
-    for path in paths:
-        full_path = Path(data_dir) / path
-        if not full_path.exists():
-            continue
+    print("🔍 이미지 파일 유효성 검사...")
+    
+    with DatasetIndex(data_dir) as index:
+        # 같은 이름으로 덮어쓴 파일은 디렉토리 mtime이 바뀌지 않으므로 파일별 크기/수정 시각까지 확인
+        index.update(full=True)
+        if revalidate:
+            index.conn.execute("UPDATE images SET valid = NULL")
+        pending = index.pending_validation()
+        print(f"📁 검사 대상: {len(pending)}장 (변경 없는 파일은 건너뜀)")
         
-        print(f"\n📁 {path} 검사 중...")
-        images = []
-        for ext in ['*.jpg', '*.jpeg', '*.png']:
-            images.extend(list(full_path.glob(ext)))
+        if pending:
+            num_workers = num_workers or os.cpu_count()
+            # TensorFlow는 fork 이후 안전하지 않으므로 spawn 사용
+            with ProcessPoolExecutor(max_workers=num_workers, mp_context=mp.get_context("spawn"),
+                                     initializer=_init_validator) as executor:
+                batch = []
+                for i, result in enumerate(executor.map(_validate_image, pending, chunksize=64), 1):
+                    batch.append(result)
+                    if len(batch) >= 1000:
+                        index.record_validation(batch)
+                        batch = []
+                        print(f"  {i}/{len(pending)}")
+                index.record_validation(batch)
         
-        for img_path in images:
-            try:
-                with Image.open(img_path) as img:
-                    width, height = img.size
-                    
-                    # 너무 작은 이미지 체크
-                    if width < 200 or height < 200:
-                        small_images.append((str(img_path), width, height))
-                    
-                    # 이미지 로드 테스트
-                    img.verify()
-                    
-            except Exception as e:
-                corrupted_files.append((str(img_path), str(e)))
+        corrupted_files = index.invalid_files()
+        small_images = [
+            (os.path.join(data_dir, path), width, height)
+            for path, width, height in index.conn.execute(
+                "SELECT path, width, height FROM images WHERE valid = 1 AND (width < ? OR height < ?) ORDER BY path",
+                (min_size, min_size))
+        ]
+        decode_ms = index.conn.execute("SELECT AVG(decode_ms), MAX(decode_ms) FROM images WHERE valid = 1").fetchone()
+        rotated = index.conn.execute("SELECT COUNT(*) FROM images WHERE orientation > 1").fetchone()[0]
+    
+    if decode_ms[0] is not None:
+        print(f"⏱️ 디코딩 시간: 평균 {decode_ms[0]:.1f}ms, 최대 {decode_ms[1]:.1f}ms")
+    if rotated:
+        print(f"🔄 EXIF 회전 정보가 있는 이미지: {rotated}장 (TensorFlow 디코더는 회전을 적용하지 않음)")
+    
+    if quarantine_dir and corrupted_files:
+        # 격리 목록을 먼저 기록해 split 재실행이 같은 원본을 다시 배치하지 않도록 함
+        with DatasetIndex(data_dir) as index:
+            index.record_quarantine(corrupted_files)
+        for file, _ in corrupted_files:
+            target = Path(quarantine_dir) / os.path.relpath(file, data_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(file, target)
+        print(f"🚚 손상된 파일 {len(corrupted_files)}개를 {quarantine_dir}로 이동")
+        with DatasetIndex(data_dir) as index:
+            index.update()
     
     # 결과 출력
     if corrupted_files:
@@ -213,6 +348,437 @@ def validate_images(data_dir="data"):
     
     return corrupted_files, small_images
 
+def _dhash(img_path, hash_size=8):
+    """차이 해시(dHash): 축소한 흑백 이미지에서 가로로 이웃한 픽셀의 밝기 대소 비교 (64비트 정수)"""
+    with Image.open(img_path) as img:
+        img.draft("L", (hash_size * 8, hash_size * 8))  # JPEG는 DCT 단계에서 축소 디코딩
+        pixels = list(img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+    
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+def _safe_dhash(img_path):
+    try:
+        return img_path, _dhash(img_path)
+    except Exception:
+        return img_path, None
+
+def _hamming(a, b):
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    """해밍 거리 BK-트리 (거리 d 이내 검색 시 삼각 부등식으로 대부분의 가지를 건너뜀)"""
+    def __init__(self):
+        self.root = None  # (해시, [항목], {거리: 자식 노드})
+    
+    def add(self, value, item):
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = _hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+    
+    def search(self, value, max_distance):
+        """거리 max_distance 이내 항목 목록"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = _hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend(node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+def compute_dhashes(paths, num_workers=None, cache_path=None):
+    """
+    이미지 dHash를 프로세스 병렬로 계산 {경로: 해시}
+    cache_path 지정 시 크기/수정 시각이 같은 파일은 이전 결과 재사용
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    
+    hashes = {}
+    signatures = {}
+    pending = []
+    for path in paths:
+        stat = os.stat(path)
+        signatures[path] = f"{stat.st_size}:{stat.st_mtime_ns}"
+        cached = cache.get(path)
+        if cached and cached[0] == signatures[path]:
+            hashes[path] = int(cached[1], 16)
+        else:
+            pending.append(path)
+    
+    if pending:
+        print(f"  해시 계산: {len(pending)}장 (캐시 사용 {len(hashes)}장)")
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            for path, value in executor.map(_safe_dhash, pending, chunksize=64):
+                if value is not None:
+                    hashes[path] = value
+    
+    if cache_path:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({path: [signatures[path], f"{value:016x}"] for path, value in hashes.items()}, f)
+    
+    return hashes
+
+def cluster_duplicates(hashes, max_distance=4):
+    """BK-트리로 근접 중복을 찾고 union-find로 묶은 클러스터 목록 (2장 이상인 것만)"""
+    parent = {path: path for path in hashes}
+    
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+    
+    tree = BKTree()
+    for path, value in hashes.items():
+        for match in tree.search(value, max_distance):
+            parent[find(path)] = find(match)
+        tree.add(value, path)
+    
+    clusters = {}
+    for path in hashes:
+        clusters.setdefault(find(path), []).append(path)
+    return sorted((sorted(c) for c in clusters.values() if len(c) > 1), key=len, reverse=True)
+
+def find_duplicates(source_dir="data/raw", max_distance=4, num_workers=None, report_path=None):
+    """
+    원본 클래스 폴더의 근접 중복 이미지 클러스터 탐색
+    반환값: {경로: 그룹 키} (split_dataset(groups=...)에 전달하면 클러스터가 한쪽 분할에만 배치됨)
+    """
+    print(f"🔎 근접 중복 탐색 (해밍 거리 {max_distance} 이하)")
+    
+    paths = []
+    for class_dir in CLASS_LABELS:
+        class_path = Path(source_dir) / class_dir
+        if class_path.exists():
+            paths.extend(str(p) for p in sorted(class_path.iterdir()) if p.suffix.lower() in IMAGE_EXTENSIONS)
+    
+    hashes = compute_dhashes(paths, num_workers, cache_path=os.path.join(source_dir, ".dhash_cache.json"))
+    clusters = cluster_duplicates(hashes, max_distance)
+    
+    groups = {}
+    report = []
+    for cluster in clusters:
+        # 클러스터에서 가장 앞선 파일 이름을 그룹 키로 사용 (파일이 추가돼도 대부분 유지)
+        key = "dup:" + Path(cluster[0]).name
+        classes = sorted({Path(path).parent.name for path in cluster})
+        groups.update({path: key for path in cluster})
+        report.append({"group": key, "size": len(cluster), "classes": classes, "files": cluster})
+    
+    duplicate_count = sum(len(c) - 1 for c in clusters)
+    print(f"📁 {len(hashes)}장 중 중복 클러스터 {len(clusters)}개 (중복 이미지 {duplicate_count}장)")
+    mixed = [r for r in report if len(r["classes"]) > 1]
+    if mixed:
+        print(f"⚠️ 서로 다른 클래스에 있는 중복 클러스터 {len(mixed)}개 (라벨 확인 필요)")
+    
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"max_distance": max_distance, "clusters": report}, f, indent=2, ensure_ascii=False)
+        print(f"📋 리포트 저장: {report_path}")
+    
+    return groups
+
+def check_leakage(data_dir="data", max_distance=4, num_workers=None):
+    """훈련/검증 양쪽에 걸친 근접 중복(데이터 누수) 탐색"""
+    print(f"🔎 훈련/검증 데이터 누수 검사 (해밍 거리 {max_distance} 이하)")
+    
+    with DatasetIndex(data_dir) as index:
+        index.update()
+        train_paths = index.files("train")[0]
+        val_paths = index.files("validation")[0]
+    
+    hashes = compute_dhashes(train_paths + val_paths, num_workers,
+                             cache_path=os.path.join(data_dir, ".dhash_cache.json"))
+    train_set = set(train_paths)
+    
+    leaks = []
+    for cluster in cluster_duplicates(hashes, max_distance):
+        in_train = [p for p in cluster if p in train_set]
+        if in_train and len(in_train) < len(cluster):
+            leaks.append({"train": in_train, "validation": [p for p in cluster if p not in train_set]})
+    
+    if leaks:
+        print(f"❌ 양쪽 분할에 걸친 중복 클러스터 {len(leaks)}개:")
+        for leak in leaks[:20]:
+            print(f"  {leak['train'][0]} ↔ {leak['validation'][0]} (총 {len(leak['train']) + len(leak['validation'])}장)")
+        print("   python data_tools.py split --dedup_distance 4 로 다시 분할하면 클러스터가 한쪽에만 배치됩니다")
+    else:
+        print("✅ 훈련/검증 간 중복 없음")
+    
+    return leaks
+
+PREPROCESS_MANIFEST = "preprocess_manifest.json"
+
+def _preprocess_image(source, target, max_side, quality, previous_hash=None):
+    """EXIF 방향 적용, 긴 변 max_side 이하로 축소(비율 유지), JPEG 재인코딩 (내용이 같으면 건너뜀)"""
+    from PIL import ImageOps
+    
+    try:
+        digest = file_hash(source)
+        if digest == previous_hash and os.path.exists(target):
+            return source, digest, "unchanged", None
+        
+        with Image.open(source) as img:
+            img.draft("RGB", (max_side, max_side))  # JPEG는 DCT 단계에서 축소 디코딩
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+            
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target + ".tmp"
+            img.save(tmp_path, format="JPEG", quality=quality, optimize=True)
+            os.replace(tmp_path, target)
+        return source, digest, "processed", None
+    except Exception as e:
+        Path(target + ".tmp").unlink(missing_ok=True)
+        return source, None, "failed", str(e)
+
+def _preprocess_output_names(img_paths):
+    """
+    원본 경로 → 결과 파일 이름 (JPEG는 확장자를 .jpg로 통일, 그 외는 원래 이름 뒤에 .jpg)
+    x.jpg / x.jpeg / x.JPG처럼 같은 이름이 되는 원본은 원래 확장자를 포함한 이름(x.jpeg.jpg)으로 구분
+    """
+    preferred = {
+        img_path: (img_path.stem if img_path.suffix.lower() in (".jpg", ".jpeg") else img_path.name) + ".jpg"
+        for img_path in img_paths
+    }
+    names = dict(preferred)
+    while True:
+        # 대소문자만 다른 이름도 같은 파일이 되는 파일 시스템이 있으므로 소문자로 비교
+        counts = {}
+        for name in names.values():
+            counts[name.lower()] = counts.get(name.lower(), 0) + 1
+        colliding = [img_path for img_path, name in names.items()
+                     if counts[name.lower()] > 1 and name != img_path.name + ".jpg"]
+        if not colliding:
+            return names
+        for img_path in colliding:
+            names[img_path] = img_path.name + ".jpg"
+
+def preprocess_raw_images(source_dir="data/raw", output_dir="data/raw_preprocessed", max_side=512,
+                          quality=90, num_workers=None):
+    """
+    원본 이미지를 한 번만 축소/재인코딩한 파생 데이터셋 생성 (클래스 폴더 구조 유지)
+    내용 해시 manifest로 새 파일/바뀐 파일만 처리하고, 원본에서 삭제된 파일의 결과는 정리
+    이후 split --source_dir <output_dir>로 분할하면 훈련 시 읽는 데이터 양이 크게 줄어듦
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    print(f"🪄 원본 전처리 시작 (긴 변 {max_side}px, JPEG 품질 {quality})")
+    
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / PREPROCESS_MANIFEST
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    
+    settings = {"max_side": max_side, "quality": quality}
+    # 이전 결과 파일 (최종 manifest에 남지 않는 결과는 마지막에 삭제)
+    previous_outputs = {entry["output"] for entry in manifest.get("files", {}).values()}
+    # 설정이 바뀌면 전체를 다시 처리
+    if manifest.get("settings") != settings:
+        manifest = {"settings": settings, "files": {}}
+    files = manifest["files"]
+    
+    entries = {}
+    tasks = []
+    for class_dir in CLASS_LABELS:
+        class_path = Path(source_dir) / class_dir
+        if not class_path.exists():
+            continue
+        img_paths = [img_path for img_path in sorted(class_path.iterdir())
+                     if img_path.suffix.lower() in IMAGE_EXTENSIONS]
+        output_names = _preprocess_output_names(img_paths)
+        for img_path in img_paths:
+            rel = f"{class_dir}/{img_path.name}"
+            target = str(output_dir / class_dir / output_names[img_path])
+            stat = img_path.stat()
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "output": target}
+            entries[rel] = entry
+            
+            old = files.get(rel)
+            if (old and old["output"] == target and old["size"] == entry["size"]
+                    and old["mtime_ns"] == entry["mtime_ns"] and os.path.exists(target)):
+                entry["hash"] = old["hash"]
+                continue
+            # 크기/수정 시각이 바뀌었어도 내용 해시가 같으면 재인코딩하지 않음 (결과 이름이 바뀐 경우는 제외)
+            previous_hash = old["hash"] if old and old["output"] == target else None
+            tasks.append((str(img_path), target, rel, previous_hash))
+    
+    removed = [rel for rel in files if rel not in entries]
+    
+    results = {"processed": 0, "unchanged": 0, "failed": []}
+    if tasks:
+        print(f"📁 처리 대상: {len(tasks)}장 (유지 {len(entries) - len(tasks)}장)")
+        rels = {task[0]: task[2] for task in tasks}
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(_preprocess_image, source, target, max_side, quality, previous_hash)
+                       for source, target, _, previous_hash in tasks]
+            for future in futures:
+                source, digest, status, error = future.result()
+                rel = rels[source]
+                if status == "failed":
+                    results["failed"].append((source, error))
+                    del entries[rel]
+                    continue
+                entries[rel]["hash"] = digest
+                results[status] += 1
+    
+    # 원본 삭제, 처리 실패, 설정/이름 변경으로 더 이상 쓰이지 않는 결과 정리
+    # (다른 원본이 사용하는 결과 파일은 유지)
+    outputs = {entry["output"] for entry in entries.values()}
+    failed_sources = {source for source, _ in results["failed"]}
+    failed_outputs = {target for source, target, _, _ in tasks if source in failed_sources}
+    for stale in (previous_outputs | failed_outputs) - outputs:
+        Path(stale).unlink(missing_ok=True)
+    
+    manifest = {"settings": settings, "files": entries}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    
+    source_bytes = sum(entry["size"] for entry in entries.values())
+    output_bytes = sum(os.path.getsize(entry["output"]) for entry in entries.values())
+    print(f"  처리: {results['processed']}장, 내용 동일: {results['unchanged']}장, 삭제: {len(removed)}장")
+    if source_bytes:
+        print(f"  용량: {source_bytes / 1024 ** 2:.1f}MB → {output_bytes / 1024 ** 2:.1f}MB "
+              f"({source_bytes / max(output_bytes, 1):.1f}배 감소)")
+    if results["failed"]:
+        print(f"  ❌ 처리 실패 {len(results['failed'])}개:")
+        for file, error in results["failed"]:
+            print(f"    {file}: {error}")
+    print(f"✅ 전처리 완료: {output_dir}")
+    print(f"   python data_tools.py split --source_dir {output_dir} 로 분할")
+    
+    return results
+
+def _encode_resized_jpeg(img_path, img_size, quality):
+    """
+    이미지를 리사이즈 후 JPEG 바이트로 재인코딩
+    파일 경로 파이프라인/추론과 같은 decode_and_resize를 사용해 저장되는 픽셀이 일치하도록 함
+    """
+    import tensorflow as tf
+    from data_utils import decode_and_resize
+    
+    image = decode_and_resize(tf.io.read_file(str(img_path)), img_size)
+    return tf.io.encode_jpeg(image, quality=quality).numpy()
+
+def _write_tfrecord_shard(shard_path, samples, img_size, quality):
+    """샤드 하나에 해당하는 (경로, 라벨) 목록을 TFRecord 파일로 기록"""
+    import tensorflow as tf
+    
+    written = 0
+    failed = []
+    with tf.io.TFRecordWriter(str(shard_path)) as writer:
+        for img_path, label in samples:
+            try:
+                image_bytes = _encode_resized_jpeg(img_path, img_size, quality)
+            except Exception as e:
+                failed.append((str(img_path), str(e)))
+                continue
+            
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image': tf.train.Feature(bytes_list=tf.train.BytesList(value=[image_bytes])),
+                'label': tf.train.Feature(int64_list=tf.train.Int64List(value=[label])),
+            }))
+            writer.write(example.SerializeToString())
+            written += 1
+    
+    return written, failed
+
+def convert_to_tfrecords(data_dir="data", output_dir="data/tfrecords", img_size=(224, 224),
+                         images_per_shard=1000, quality=95, num_workers=None, seed=42):
+    """train/validation 이미지를 리사이즈된 JPEG로 묶은 샤드 TFRecord 파일로 변환"""
+    print(f"📦 TFRecord 변환 시작 ({img_size[0]}x{img_size[1]}, 샤드당 {images_per_shard}장)")
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    num_workers = num_workers or os.cpu_count()
+    
+    with DatasetIndex(data_dir) as index:
+        index.update()
+        split_files = {split: index.files(split) for split in ["train", "validation"]}
+    
+    for split, (paths, labels) in split_files.items():
+        samples = list(zip(paths, labels))
+        
+        if not samples:
+            print(f"⚠️ {split}: 이미지 없음, 건너뜀")
+            continue
+        
+        # 샤드마다 클래스가 섞이도록 한 번 섞어서 기록
+        random.Random(seed).shuffle(samples)
+        num_shards = max(1, (len(samples) + images_per_shard - 1) // images_per_shard)
+        
+        # 기존 샤드 정리
+        for old_shard in output_dir.glob(f"{split}-*.tfrecord"):
+            old_shard.unlink()
+        
+        shards = []
+        for i in range(num_shards):
+            shard_path = output_dir / f"{split}-{i:05d}-of-{num_shards:05d}.tfrecord"
+            shards.append((shard_path, samples[i::num_shards]))
+        
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            results = list(executor.map(
+                lambda shard: _write_tfrecord_shard(shard[0], shard[1], img_size, quality),
+                shards
+            ))
+        
+        written = sum(r[0] for r in results)
+        failed = [f for r in results for f in r[1]]
+        
+        # 클래스별 개수 기록 (DataLoader.get_class_weights에서 사용)
+        failed_paths = {f[0] for f in failed}
+        counts = {"0": 0, "1": 0}
+        for img_path, label in samples:
+            if str(img_path) not in failed_paths:
+                counts[str(label)] += 1
+        
+        info = {
+            "img_size": list(img_size),
+            "num_examples": written,
+            "num_shards": num_shards,
+            "counts": counts,
+            "quality": quality
+        }
+        with open(output_dir / f"{split}_info.json", "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2)
+        
+        print(f"📁 {split}: {written}장 → {num_shards}개 샤드")
+        if failed:
+            print(f"  ❌ 변환 실패 {len(failed)}개:")
+            for file, error in failed:
+                print(f"    {file}: {error}")
+    
+    print(f"✅ TFRecord 변환 완료: {output_dir}")
+    print(f"   훈련 시 DataLoader(tfrecord_dir='{output_dir}') 또는 CONFIG['tfrecord_dir'] 사용")
+
 def show_sample_images(data_dir="data/train", samples_per_class=3):
     """클래스별 샘플 이미지 표시"""
     print("🖼️ 샘플 이미지 표시...")
@@ -256,15 +822,131 @@ def show_sample_images(data_dir="data/train", samples_per_class=3):
     plt.show()
     print("📊 샘플 이미지를 data_samples.png로 저장했습니다.")
 
-if __name__ == "__main__":
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='데이터 준비 도구')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    tfrecord_parser = subparsers.add_parser('tfrecord', help='train/validation을 샤드 TFRecord로 변환')
+    tfrecord_parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    tfrecord_parser.add_argument('--output_dir', type=str, default='data/tfrecords', help='출력 디렉토리')
+    tfrecord_parser.add_argument('--img_size', type=int, default=224, help='저장할 이미지 크기')
+    tfrecord_parser.add_argument('--images_per_shard', type=int, default=1000, help='샤드당 이미지 수')
+    tfrecord_parser.add_argument('--quality', type=int, default=95, help='JPEG 재인코딩 품질')
+    tfrecord_parser.add_argument('--workers', type=int, default=None, help='병렬 작업 수')
+    
+    validate_parser = subparsers.add_parser('validate', help='이미지 전체 디코딩 검사 (바뀐 파일만)')
+    validate_parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    validate_parser.add_argument('--workers', type=int, default=None, help='검사 프로세스 수')
+    validate_parser.add_argument('--quarantine_dir', type=str, default=None, help='손상 파일을 옮길 디렉토리')
+    validate_parser.add_argument('--revalidate', action='store_true', help='이전 결과와 무관하게 전체 재검사')
+    
+    preprocess_parser = subparsers.add_parser('preprocess', help='원본 이미지를 축소/재인코딩한 파생 데이터셋 생성 (바뀐 파일만)')
+    preprocess_parser.add_argument('--source_dir', type=str, default='data/raw', help='원본 이미지 디렉토리')
+    preprocess_parser.add_argument('--output_dir', type=str, default='data/raw_preprocessed', help='출력 디렉토리')
+    preprocess_parser.add_argument('--max_side', type=int, default=512, help='긴 변 최대 크기 (비율 유지)')
+    preprocess_parser.add_argument('--quality', type=int, default=90, help='JPEG 재인코딩 품질')
+    preprocess_parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수')
+    
+    dedup_parser = subparsers.add_parser('dedup', help='원본 이미지 근접 중복 클러스터 리포트')
+    dedup_parser.add_argument('--source_dir', type=str, default='data/raw', help='원본 이미지 디렉토리')
+    dedup_parser.add_argument('--max_distance', type=int, default=4, help='중복으로 볼 dHash 해밍 거리')
+    dedup_parser.add_argument('--report', type=str, default='data/duplicates.json', help='리포트 경로')
+    dedup_parser.add_argument('--workers', type=int, default=None, help='해시 계산 프로세스 수')
+    
+    leakage_parser = subparsers.add_parser('leakage', help='훈련/검증 간 근접 중복 검사 (발견 시 종료 코드 1)')
+    leakage_parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    leakage_parser.add_argument('--max_distance', type=int, default=4, help='중복으로 볼 dHash 해밍 거리')
+    leakage_parser.add_argument('--workers', type=int, default=None, help='해시 계산 프로세스 수')
+    
+    status_parser = subparsers.add_parser('status', help='데이터셋 인덱스로 클래스별 이미지 수 확인 (훈련 데이터가 없으면 종료 코드 1)')
+    status_parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    
+    split_parser = subparsers.add_parser('split', help='raw 이미지를 train/validation으로 분할 (재실행 시 새 파일만 처리)')
+    split_parser.add_argument('--source_dir', type=str, default='data/raw', help='원본 이미지 디렉토리')
+    split_parser.add_argument('--data_dir', type=str, default='data', help='train/validation을 만들 디렉토리')
+    split_parser.add_argument('--train_ratio', type=float, default=0.8, help='훈련 데이터 비율')
+    split_parser.add_argument('--seed', type=int, default=42, help='분할 시드')
+    split_parser.add_argument('--link', type=str, default='hardlink', choices=LINK_MODES,
+                              help='배치 방식 (링크가 불가능하면 복사)')
+    split_parser.add_argument('--group_pattern', type=str, default=None,
+                              help='같은 분할에 둘 파일을 묶는 파일 이름 정규식 (예: "^(card\\d+)_")')
+    split_parser.add_argument('--dedup_distance', type=int, default=None,
+                              help='지정 시 dHash 해밍 거리 이내의 근접 중복을 같은 분할에 배치')
+    split_parser.add_argument('--workers', type=int, default=None, help='병렬 작업 수')
+    split_parser.add_argument('--manifest', type=str, default=None, help='manifest 경로 (기본: <data_dir>/split_manifest.csv)')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'validate':
+        corrupted_files, _ = validate_images(
+            data_dir=args.data_dir,
+            num_workers=args.workers,
+            quarantine_dir=args.quarantine_dir,
+            revalidate=args.revalidate
+        )
+        sys.exit(1 if corrupted_files and not args.quarantine_dir else 0)
+    
+    if args.command == 'status':
+        total_train, _ = check_data_status(args.data_dir)
+        sys.exit(0 if total_train > 0 else 1)
+    
+    if args.command == 'preprocess':
+        preprocess_raw_images(args.source_dir, args.output_dir, args.max_side, args.quality, args.workers)
+        return
+    
+    if args.command == 'dedup':
+        find_duplicates(args.source_dir, args.max_distance, args.workers, args.report)
+        return
+    
+    if args.command == 'leakage':
+        leaks = check_leakage(args.data_dir, args.max_distance, args.workers)
+        sys.exit(1 if leaks else 0)
+    
+    if args.command == 'split':
+        groups = None
+        if args.dedup_distance is not None:
+            groups = find_duplicates(args.source_dir, args.dedup_distance, args.workers)
+        split_dataset(
+            source_dir=args.source_dir,
+            data_dir=args.data_dir,
+            train_ratio=args.train_ratio,
+            seed=args.seed,
+            link_mode=args.link,
+            group_pattern=args.group_pattern,
+            groups=groups,
+            num_workers=args.workers,
+            manifest_path=args.manifest
+        )
+        return
+    
+    if args.command == 'tfrecord':
+        convert_to_tfrecords(
+            data_dir=args.data_dir,
+            output_dir=args.output_dir,
+            img_size=(args.img_size, args.img_size),
+            images_per_shard=args.images_per_shard,
+            quality=args.quality,
+            num_workers=args.workers
+        )
+        return
+    
     print("=== 📸 데이터 준비 도구 ===")
     print("1. setup_data_structure()     # 폴더 구조 생성")
     print("2. check_data_status()        # 현재 데이터 상태 확인")  
     print("3. split_data_automatically() # 원본에서 train/val 분할")
     print("4. validate_images()          # 이미지 유효성 검사")
     print("5. show_sample_images()       # 샘플 이미지 확인")
+    print("6. convert_to_tfrecords()     # 샤드 TFRecord 변환")
     print("\n사용법:")
     print("python data_tools.py")
+    print("python data_tools.py status")
+    print("python data_tools.py validate --quarantine_dir data/quarantine")
+    print("python data_tools.py preprocess --max_side 512")
+    print("python data_tools.py split --train_ratio 0.8 --dedup_distance 4")
+    print("python data_tools.py leakage")
+    print("python data_tools.py tfrecord --output_dir data/tfrecords")
     print("그 후 원하는 함수 실행")
     
     # 폴더 구조 자동 생성
@@ -272,3 +954,6 @@ if __name__ == "__main__":
     
     # 현재 상태 확인
     check_data_status()
+
+if __name__ == "__main__":
+    main()
@@ -6,28 +6,8 @@ echo "=== 외국인등록증 뒷면 분류기 전체 파이프라인 ==="
 
 # 1. 데이터 확인
 echo "1. 데이터 확인 중..."
-python -c "
-import os
-train_path = 'data/train'
-val_path = 'data/validation'
-
-def count_files(directory):
-    if not os.path.exists(directory):
-        return 0
-    return len([f for f in os.listdir(directory) if f.lower().endswith(('.png', '.jpg', '.jpeg'))])
-
-train_foreigner = count_files(os.path.join(train_path, 'foreigner_card_back'))
-train_other = count_files(os.path.join(train_path, 'other_documents'))
-val_foreigner = count_files(os.path.join(val_path, 'foreigner_card_back'))
-val_other = count_files(os.path.join(val_path, 'other_documents'))
-
-print(f'훈련 데이터: 외국인등록증 {train_foreigner}장, 기타 {train_other}장')
-print(f'검증 데이터: 외국인등록증 {val_foreigner}장, 기타 {val_other}장')
-
-if train_foreigner + train_other == 0:
-    print('⚠️ 훈련 데이터가 없습니다!')
-    exit(1)
-"
+# 데이터셋 인덱스(data/index.sqlite)에서 조회, 바뀐 디렉토리만 다시 스캔
+python data_tools.py status
 
 if [ $? -ne 0 ]; then
     echo "데이터를 먼저 준비해주세요."
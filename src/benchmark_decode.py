@@ -0,0 +1,159 @@
+"""
+이미지 디코딩 마이크로벤치마크 (전체 디코딩 vs JPEG 축소 디코딩)
+이미지당 디코딩+리사이즈 시간과, 전체 디코딩 대비 결과 차이(픽셀 평균 절대 오차, 모델 점수 차이)를 측정
+"""
+import os
+import json
+import time
+import cv2
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+from data_utils import JPEG_DECODE_RATIOS, decode_and_resize, jpeg_decode_ratio_index
+from predict import iter_image_paths
+from benchmark_models import git_commit
+
+# OpenCV(libjpeg-turbo) 축소 디코딩 플래그 - TF 디코더와 같게 EXIF 회전은 적용하지 않음
+CV2_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def cv2_decode_reduced(image_bytes, img_size):
+    """OpenCV 축소 디코딩 + 리사이즈 (비교용, RGB uint8)"""
+    ratio = 1
+    if tf.io.is_jpeg(image_bytes):
+        height, width = tf.io.extract_jpeg_shape(image_bytes).numpy()[:2]
+        ratio = JPEG_DECODE_RATIOS[int(jpeg_decode_ratio_index(height, width, img_size))]
+
+    flags = CV2_REDUCED_FLAGS[ratio] | cv2.IMREAD_IGNORE_ORIENTATION
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flags)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return cv2.resize(image, (img_size[1], img_size[0]), interpolation=cv2.INTER_LINEAR)
+
+def make_decoders(img_size):
+    """이름 → (바이트 → uint8 배열) 디코더"""
+    spec = [tf.TensorSpec((), tf.string)]
+    full = tf.function(lambda data: decode_and_resize(data, img_size, reduced_jpeg=False), input_signature=spec)
+    reduced = tf.function(lambda data: decode_and_resize(data, img_size), input_signature=spec)
+    return {
+        'tf_full': lambda data: full(data).numpy(),
+        'tf_reduced': lambda data: reduced(data).numpy(),
+        'cv2_reduced': lambda data: cv2_decode_reduced(data, img_size),
+    }
+
+def time_decoder(decode_fn, payloads, repeats=3):
+    """이미지별 최소 시간(ms)의 중앙값/평균과 디코딩 결과"""
+    outputs, times = [], []
+    decode_fn(payloads[0])  # 트레이싱 워밍업
+    for data in payloads:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = decode_fn(data)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            best = elapsed if best is None else min(best, elapsed)
+        outputs.append(output)
+        times.append(best)
+    return {
+        'median_ms': float(np.median(times)),
+        'mean_ms': float(np.mean(times)),
+    }, np.stack(outputs)
+
+def compare_outputs(reference, candidate):
+    """전체 디코딩 결과 대비 픽셀 차이 (0~255 기준)"""
+    diff = np.abs(reference.astype(np.float32) - candidate.astype(np.float32))
+    return {
+        'mean_abs_diff': float(diff.mean()),
+        'max_abs_diff': float(diff.max()),
+    }
+
+def run_decode_benchmark(inputs, img_size=(224, 224), limit=200, repeats=3, model_path=None):
+    """디코더별 {시간, 전체 디코딩 대비 차이} - model_path 지정 시 점수 차이와 예측 일치율도 측정"""
+    paths = []
+    for path in iter_image_paths(inputs):
+        paths.append(path)
+        if len(paths) >= limit:
+            break
+    if not paths:
+        raise ValueError("벤치마크할 이미지가 없습니다")
+
+    payloads = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            payloads.append(f.read())
+
+    model = None
+    if model_path:
+        model = tf.keras.models.load_model(model_path, compile=False)
+        img_size = tuple(model.input_shape[1:3])
+    print(f"이미지 {len(payloads)}장, 목표 크기 {img_size}")
+
+    results = {}
+    reference, reference_scores = None, None
+    for name, decode_fn in make_decoders(img_size).items():
+        timing, outputs = time_decoder(decode_fn, payloads, repeats)
+        result = dict(timing)
+
+        if reference is None:
+            reference = outputs
+        else:
+            result.update(compare_outputs(reference, outputs))
+
+        if model is not None:
+            scores = model.predict(outputs, batch_size=32, verbose=0)[:, 0]
+            if reference_scores is None:
+                reference_scores = scores
+            else:
+                result['max_score_diff'] = float(np.abs(scores - reference_scores).max())
+                result['label_agreement'] = float(((scores > 0.5) == (reference_scores > 0.5)).mean())
+
+        results[name] = result
+        print(f"  {name}: 중앙값 {result['median_ms']:.2f}ms, 평균 {result['mean_ms']:.2f}ms"
+              + (f", 평균 픽셀 차이 {result['mean_abs_diff']:.2f}" if 'mean_abs_diff' in result else '')
+              + (f", 예측 일치율 {result['label_agreement'] * 100:.1f}%" if 'label_agreement' in result else ''))
+
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='이미지 디코딩 마이크로벤치마크 (전체 vs 축소 디코딩)')
+    parser.add_argument('inputs', nargs='+', help='이미지 파일 또는 디렉토리 (큰 원본 사진 권장)')
+    parser.add_argument('--img_size', type=int, default=224, help='리사이즈 목표 크기')
+    parser.add_argument('--limit', type=int, default=200, help='측정할 최대 이미지 수')
+    parser.add_argument('--repeats', type=int, default=3, help='이미지당 반복 횟수 (최소값 사용)')
+    parser.add_argument('--model_path', type=str, default=None, help='예측 일치 확인용 모델 (입력 크기는 모델 기준)')
+    parser.add_argument('--output_dir', type=str, default='models/benchmarks', help='결과 저장 디렉토리')
+
+    args = parser.parse_args()
+
+    results = run_decode_benchmark(
+        args.inputs,
+        img_size=(args.img_size, args.img_size),
+        limit=args.limit,
+        repeats=args.repeats,
+        model_path=args.model_path
+    )
+
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(),
+        'tensorflow_version': tf.__version__,
+        'opencv_version': cv2.__version__,
+        'inputs': args.inputs,
+        'model_path': args.model_path,
+        'results': results
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"decode_{report['commit']}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    speedup = results['tf_full']['median_ms'] / max(results['tf_reduced']['median_ms'], 1e-9)
+    print(f"\n축소 디코딩 속도 향상: {speedup:.1f}배")
+    print(f"결과 저장됨: {output_path}")
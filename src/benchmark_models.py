@@ -0,0 +1,308 @@
+"""
+모델 변형 벤치마크 스크립트 (빌더 × 입력 크기 × 배치 크기)
+콜드 스타트 로드 시간, 단일 이미지 p50/p95/p99 지연, 배치 처리량, 최대 메모리,
+Keras(.h5) / SavedModel / TFLite / tfjs 직렬화 크기를 측정해 커밋별 JSON과 비교 표(markdown)로 저장
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+from model import MODEL_BUILDERS, create_model
+from profiler import host_memory_mb
+
+ARTIFACT_FORMATS = ('keras', 'saved_model', 'tflite', 'tfjs')
+# 별도 프로세스에서 로드해 콜드 스타트를 측정할 수 있는 형식 (tfjs는 브라우저 전용이라 크기만 측정)
+LOADABLE_FORMATS = ('keras', 'saved_model', 'tflite')
+
+def git_commit():
+    """현재 커밋 해시 (작업 트리가 수정된 상태면 -dirty)"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], stderr=subprocess.DEVNULL) != 0
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def artifact_size(path):
+    """파일 또는 디렉토리 전체 크기 (bytes)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+def export_artifacts(model, output_dir):
+    """모델을 형식별로 저장하고 {형식: 경로} 반환 (tensorflowjs가 없으면 tfjs 생략)"""
+    from convert_to_tflite import convert_keras_model
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'keras': os.path.join(output_dir, 'model.h5'),
+        'saved_model': os.path.join(output_dir, 'saved_model'),
+        'tflite': os.path.join(output_dir, 'model.tflite'),
+    }
+    model.save(paths['keras'])
+    model.save(paths['saved_model'], save_format='tf')
+    with open(paths['tflite'], 'wb') as f:
+        f.write(convert_keras_model(model, 'float32'))
+
+    try:
+        import tensorflowjs as tfjs
+    except ImportError:
+        print("  ⚠️ tensorflowjs가 없어 tfjs 크기 측정을 건너뜁니다")
+    else:
+        paths['tfjs'] = os.path.join(output_dir, 'tfjs')
+        tfjs.converters.save_keras_model(model, paths['tfjs'])
+
+    return paths
+
+def load_predict_fn(artifact_format, path):
+    """형식별 모델 로드 후 (predict_fn, img_size) 반환"""
+    if artifact_format == 'tflite':
+        from inference import TFLiteModel
+        tflite_model = TFLiteModel(path)
+        return tflite_model.predict, tflite_model.img_size
+
+    model = tf.keras.models.load_model(path, compile=False)
+    return model.predict_on_batch, tuple(model.input_shape[1:3])
+
+def probe_cold_start(artifact_format, path):
+    """
+    새 프로세스에서 모델 로드 + 첫 예측 시간과 최대 메모리 측정
+    같은 프로세스에서는 이미 로드된 그래프/커널 캐시 때문에 콜드 스타트를 잴 수 없음
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--probe_format', artifact_format, '--probe_path', path]
+    output = subprocess.check_output(command, text=True, stderr=subprocess.DEVNULL)
+    # TensorFlow 로그가 섞일 수 있으므로 마지막 줄만 결과로 사용
+    return json.loads(output.strip().splitlines()[-1])
+
+def _run_probe(artifact_format, path):
+    """probe_cold_start가 띄운 자식 프로세스에서 실행"""
+    start = time.perf_counter()
+    predict_fn, img_size = load_predict_fn(artifact_format, path)
+    load_sec = time.perf_counter() - start
+
+    image = np.zeros((1,) + img_size + (3,), dtype=np.uint8)
+    start = time.perf_counter()
+    predict_fn(image)
+    first_predict_ms = (time.perf_counter() - start) * 1000.0
+
+    result = {'load_sec': load_sec, 'first_predict_ms': first_predict_ms}
+    result.update(host_memory_mb())
+    print(json.dumps(result))
+
+def latency_percentiles(predict_fn, image, num_runs=100, warmup=10):
+    """단일 이미지 예측 지연 시간 분포 (ms)"""
+    for _ in range(warmup):
+        predict_fn(image)
+
+    timings = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        predict_fn(image)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+def batch_throughput(predict_fn, img_size, batch_size, num_runs=10, warmup=2):
+    """배치 예측 처리량 (images/sec)"""
+    images = np.random.randint(0, 256, size=(batch_size,) + img_size + (3,), dtype=np.uint8)
+    for _ in range(warmup):
+        predict_fn(images)
+
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        predict_fn(images)
+    return batch_size * num_runs / (time.perf_counter() - start)
+
+def benchmark_artifacts(paths, img_size, batch_sizes, num_runs, validation_dataset=None):
+    """저장된 형식별 모델의 크기/콜드 스타트/지연/처리량(/정확도) 측정"""
+    from convert_to_tflite import evaluate_accuracy
+
+    image = np.random.randint(0, 256, size=(1,) + img_size + (3,), dtype=np.uint8)
+    results = {}
+
+    for artifact_format, path in paths.items():
+        result = {'size_bytes': artifact_size(path)}
+
+        if artifact_format in LOADABLE_FORMATS:
+            try:
+                result['cold_start'] = probe_cold_start(artifact_format, path)
+            except (subprocess.CalledProcessError, ValueError) as e:
+                print(f"  ⚠️ {artifact_format} 콜드 스타트 측정 실패: {e}")
+
+            predict_fn, _ = load_predict_fn(artifact_format, path)
+            result['latency'] = latency_percentiles(predict_fn, image, num_runs)
+            result['throughput'] = {
+                str(batch_size): batch_throughput(predict_fn, img_size, batch_size)
+                for batch_size in batch_sizes
+            }
+            if validation_dataset is not None:
+                result['accuracy'] = evaluate_accuracy(predict_fn, validation_dataset)
+
+            print(f"  {artifact_format:<12} {result['size_bytes'] / (1024 * 1024):7.2f}MB  "
+                  f"p50 {result['latency']['p50_ms']:.2f}ms  p99 {result['latency']['p99_ms']:.2f}ms")
+        else:
+            print(f"  {artifact_format:<12} {result['size_bytes'] / (1024 * 1024):7.2f}MB")
+
+        results[artifact_format] = result
+
+    return results
+
+def run_benchmark(model_types, img_sizes, batch_sizes, num_runs=100, model_paths=None, data_dir=None):
+    """
+    빌더 × 입력 크기 조합 (가중치는 구조만 같으면 지연/크기에 영향 없음)
+    model_paths가 있으면 훈련된 모델도 자체 입력 크기로 측정하고, data_dir가 있으면 검증 정확도 포함
+    """
+    from data_utils import DataLoader
+
+    variants = []
+    for model_type in model_types:
+        for size in img_sizes:
+            variants.append((f'{model_type}_{size}', model_type, (size, size), None))
+    for model_path in model_paths or []:
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        variants.append((name, None, None, model_path))
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='benchmark_models_')
+    try:
+        for name, model_type, img_size, model_path in variants:
+            print(f"\n=== {name} ===")
+            tf.keras.backend.clear_session()
+            if model_path:
+                model = tf.keras.models.load_model(model_path, compile=False)
+                img_size = tuple(model.input_shape[1:3])
+            else:
+                model = create_model(model_type, input_shape=img_size + (3,), num_classes=2)
+
+            validation_dataset = None
+            if model_path and data_dir and os.path.exists(os.path.join(data_dir, 'validation')):
+                validation_dataset = DataLoader(data_dir=data_dir, img_size=img_size, batch_size=32).create_dataset('validation')
+
+            paths = export_artifacts(model, os.path.join(work_dir, name))
+            results[name] = {
+                'model_type': model_type,
+                'model_path': model_path,
+                'img_size': list(img_size),
+                'params': model.count_params(),
+                'formats': benchmark_artifacts(paths, img_size, batch_sizes, num_runs, validation_dataset)
+            }
+            shutil.rmtree(os.path.join(work_dir, name), ignore_errors=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+def format_markdown(report, baseline=None):
+    """결과 비교 표 (baseline 리포트가 있으면 p50 변화율 포함)"""
+    batch_sizes = [str(b) for b in report['batch_sizes']]
+    header = ['모델', '형식', '크기(MB)', '로드(s)', 'RSS(MB)', 'p50(ms)', 'p95(ms)', 'p99(ms)']
+    header += [f'bs{b} img/s' for b in batch_sizes] + ['정확도']
+    if baseline:
+        header.append(f"p50 vs {baseline['commit']}")
+
+    lines = [
+        f"# 모델 벤치마크 ({report['commit']}, {report['date'][:10]})",
+        '',
+        '| ' + ' | '.join(header) + ' |',
+        '|' + '---|' * len(header)
+    ]
+
+    def fmt(value, spec='.2f'):
+        return format(value, spec) if value is not None else '-'
+
+    for name, variant in report['results'].items():
+        for artifact_format, result in variant['formats'].items():
+            cold_start = result.get('cold_start', {})
+            latency = result.get('latency', {})
+            throughput = result.get('throughput', {})
+            row = [
+                name,
+                artifact_format,
+                fmt(result['size_bytes'] / (1024 * 1024)),
+                fmt(cold_start.get('load_sec')),
+                fmt(cold_start.get('peak_rss_mb'), '.0f'),
+                fmt(latency.get('p50_ms')),
+                fmt(latency.get('p95_ms')),
+                fmt(latency.get('p99_ms')),
+            ]
+            row += [fmt(throughput.get(b), '.1f') for b in batch_sizes]
+            row.append(fmt(result.get('accuracy'), '.4f'))
+
+            if baseline:
+                previous = (baseline['results'].get(name, {}).get('formats', {})
+                            .get(artifact_format, {}).get('latency', {}).get('p50_ms'))
+                current = latency.get('p50_ms')
+                row.append(f"{(current / previous - 1) * 100:+.1f}%" if previous and current else '-')
+
+            lines.append('| ' + ' | '.join(row) + ' |')
+
+    return '\n'.join(lines) + '\n'
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='모델 변형 벤치마크 (지연, 처리량, 크기, 메모리)')
+    parser.add_argument('--model_types', type=str, nargs='+', default=list(MODEL_BUILDERS), choices=list(MODEL_BUILDERS))
+    parser.add_argument('--img_sizes', type=int, nargs='+', default=[160, 224], help='입력 이미지 크기 목록')
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 8, 32], help='처리량 측정 배치 크기 목록')
+    parser.add_argument('--num_runs', type=int, default=100, help='지연 시간 측정 횟수')
+    parser.add_argument('--model_paths', type=str, nargs='+', default=None, help='함께 측정할 훈련된 모델(.h5) 경로')
+    parser.add_argument('--data_dir', type=str, default='data', help='훈련된 모델의 검증 정확도 측정용 데이터 디렉토리')
+    parser.add_argument('--output_dir', type=str, default='models/benchmarks', help='결과 저장 디렉토리')
+    parser.add_argument('--baseline', type=str, default=None, help='비교할 이전 커밋의 결과 JSON')
+    parser.add_argument('--probe_format', type=str, default=None, choices=LOADABLE_FORMATS, help=argparse.SUPPRESS)
+    parser.add_argument('--probe_path', type=str, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.probe_format:
+        _run_probe(args.probe_format, args.probe_path)
+        sys.exit(0)
+
+    results = run_benchmark(
+        args.model_types,
+        args.img_sizes,
+        args.batch_sizes,
+        args.num_runs,
+        args.model_paths,
+        args.data_dir
+    )
+
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(),
+        'tensorflow_version': tf.__version__,
+        'cpu_count': os.cpu_count(),
+        'batch_sizes': args.batch_sizes,
+        'results': results
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_prefix = os.path.join(args.output_dir, f"models_{report['commit']}")
+    with open(output_prefix + '.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    table = format_markdown(report, baseline)
+    with open(output_prefix + '.md', 'w', encoding='utf-8') as f:
+        f.write(table)
+
+    print("\n" + table)
+    print(f"결과 저장됨: {output_prefix}.json, {output_prefix}.md")
@@ -0,0 +1,129 @@
+"""
+훈련 처리량 벤치마크 스크립트 (모델 타입 × 정밀도/XLA 모드별 examples/sec, 에폭 시간)
+"""
+import os
+import json
+import time
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+from data_utils import DataLoader
+from model import MODEL_BUILDERS, create_model
+from train_model import CONFIG, compile_model, set_precision_policy
+
+# 모드 이름: (혼합 정밀도 정책, XLA 사용 여부)
+TRAINING_MODES = {
+    'float32': (None, False),
+    'float32_xla': (None, True),
+    'bfloat16': ('mixed_bfloat16', False),
+    'bfloat16_xla': ('mixed_bfloat16', True),
+}
+
+def create_benchmark_dataset(data_dir, img_size, batch_size, num_steps):
+    """실제 훈련 데이터가 있으면 사용하고 없으면 동일한 형태의 합성 uint8 데이터 사용"""
+    if os.path.exists(os.path.join(data_dir, 'train')):
+        data_loader = DataLoader(data_dir=data_dir, img_size=img_size, batch_size=batch_size, cache='memory')
+        dataset = data_loader.create_dataset('train')
+        # 입력 파이프라인 비용이 결과에 섞이지 않도록 캐시를 미리 채움
+        for _ in dataset:
+            pass
+        steps_per_epoch = int(dataset.cardinality().numpy())
+        if steps_per_epoch > 0:
+            return dataset.repeat(), steps_per_epoch
+
+    images = np.random.randint(0, 256, size=(batch_size,) + img_size + (3,), dtype=np.uint8)
+    labels = np.random.randint(0, 2, size=(batch_size,))
+    dataset = tf.data.Dataset.from_tensors((images, labels)).repeat()
+    return dataset, num_steps
+
+def benchmark_mode(model_type, mode, dataset, steps_per_epoch, batch_size, img_size, num_steps, warmup_steps):
+    """모델 하나를 지정 모드로 컴파일하고 훈련 스텝 처리량 측정"""
+    mixed_precision, jit_compile = TRAINING_MODES[mode]
+
+    tf.keras.backend.clear_session()
+    set_precision_policy(mixed_precision)
+    model = create_model(model_type, input_shape=img_size + (3,), num_classes=2)
+    compile_model(model, jit_compile=jit_compile)
+
+    # 그래프 생성/XLA 컴파일 시간은 제외
+    model.fit(dataset, steps_per_epoch=warmup_steps, epochs=1, verbose=0)
+
+    start = time.perf_counter()
+    model.fit(dataset, steps_per_epoch=num_steps, epochs=1, verbose=0)
+    elapsed = time.perf_counter() - start
+
+    step_time = elapsed / num_steps
+    return {
+        'examples_per_sec': batch_size / step_time,
+        'step_time_ms': step_time * 1000.0,
+        'epoch_time_sec': step_time * steps_per_epoch,
+        'steps_per_epoch': steps_per_epoch
+    }
+
+def run_benchmark(model_types, modes, data_dir, img_size, batch_size, num_steps, warmup_steps):
+    dataset, steps_per_epoch = create_benchmark_dataset(data_dir, img_size, batch_size, num_steps)
+    results = {}
+
+    for model_type in model_types:
+        results[model_type] = {}
+        for mode in modes:
+            print(f"\n=== {model_type} / {mode} ===")
+            try:
+                result = benchmark_mode(model_type, mode, dataset, steps_per_epoch, batch_size,
+                                        img_size, num_steps, warmup_steps)
+            except Exception as e:
+                # 일부 환경에서는 bfloat16/XLA가 지원되지 않음
+                print(f"  ⚠️ 실패: {e}")
+                result = {'error': str(e)}
+            else:
+                print(f"  {result['examples_per_sec']:.1f} examples/sec, "
+                      f"에폭 {result['epoch_time_sec']:.1f}초")
+            results[model_type][mode] = result
+
+    set_precision_policy(None)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='훈련 처리량 벤치마크')
+    parser.add_argument('--model_types', type=str, nargs='+', default=list(MODEL_BUILDERS), choices=list(MODEL_BUILDERS))
+    parser.add_argument('--modes', type=str, nargs='+', default=list(TRAINING_MODES), choices=list(TRAINING_MODES))
+    parser.add_argument('--data_dir', type=str, default=CONFIG['data_dir'], help='데이터 디렉토리 (없으면 합성 데이터)')
+    parser.add_argument('--img_size', type=int, default=CONFIG['img_size'][0], help='이미지 크기')
+    parser.add_argument('--batch_size', type=int, default=CONFIG['batch_size'], help='배치 크기')
+    parser.add_argument('--steps', type=int, default=50, help='측정 스텝 수')
+    parser.add_argument('--warmup_steps', type=int, default=5, help='워밍업 스텝 수')
+    parser.add_argument('--output', type=str, default='models/benchmark_training.json', help='결과 저장 경로')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.model_types,
+        args.modes,
+        args.data_dir,
+        (args.img_size, args.img_size),
+        args.batch_size,
+        args.steps,
+        args.warmup_steps
+    )
+
+    print("\n=== 결과 요약 (examples/sec) ===")
+    print(f"{'모델':<12}" + "".join(f"{mode:>15}" for mode in args.modes))
+    for model_type, mode_results in results.items():
+        row = ""
+        for mode in args.modes:
+            value = mode_results[mode].get('examples_per_sec')
+            row += f"{value:>15.1f}" if value is not None else f"{'실패':>15}"
+        print(f"{model_type:<12}{row}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'date': datetime.now().isoformat(),
+            'batch_size': args.batch_size,
+            'img_size': args.img_size,
+            'results': results
+        }, f, indent=2)
+    print(f"\n결과 저장됨: {args.output}")
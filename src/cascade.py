@@ -0,0 +1,205 @@
+"""
+2단계 캐스케이드 분류기 (작은 모델이 확신하는 이미지는 바로 반환, 애매한 이미지만 큰 모델로 전달)
+검증 데이터로 확률 구간(low, high)을 보정하고 조기 종료 비율과 평균 지연 시간을 리포트
+"""
+import os
+import json
+import time
+import threading
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+def load_predictor(model_path):
+    """모델 경로(.h5/SavedModel/.tflite)로 (예측 함수, 입력 크기) 반환 - 예측 결과는 1차원 확률"""
+    if model_path.endswith('.tflite'):
+        from inference import TFLiteModel
+        tflite_model = TFLiteModel(model_path)
+        return (lambda images: np.asarray(tflite_model.predict(images)).reshape(-1)), tflite_model.img_size
+
+    from inference import load_classifier
+    model, img_size = load_classifier(model_path)
+    return (lambda images: np.asarray(model.predict_on_batch(images)).reshape(-1)), img_size
+
+def resize_batch(images, img_size):
+    """uint8 배치를 다른 입력 크기로 리사이즈 (크기가 같으면 그대로)"""
+    if tuple(images.shape[1:3]) == tuple(img_size):
+        return images
+    resized = tf.image.resize(images, img_size)
+    return tf.saturate_cast(tf.round(resized), tf.uint8).numpy()
+
+def cascade_decision(small_scores, low, high):
+    """작은 모델 점수가 (low, high) 구간 밖이면 확신 → True"""
+    return (small_scores <= low) | (small_scores >= high)
+
+class CascadeClassifier:
+    """
+    작은 모델 → (애매한 경우만) 큰 모델
+    입력 배치는 큰 모델 크기로 디코딩하고, 작은 모델용으로는 축소해서 사용
+    """
+    def __init__(self, small_model_path, large_model_path, low=0.1, high=0.9):
+        self.small_model_path = small_model_path
+        self.large_model_path = large_model_path
+        self.small_predict, self.small_size = load_predictor(small_model_path)
+        self.large_predict, self.large_size = load_predictor(large_model_path)
+        self.img_size = self.large_size
+        self.low = low
+        self.high = high
+
+        self._lock = threading.Lock()
+        self.images = 0
+        self.forwarded = 0
+        self.total_time = 0.0
+
+    @classmethod
+    def from_config(cls, config_path):
+        """calibrate_cascade가 저장한 설정 파일로 생성"""
+        with open(config_path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config['small_model'], config['large_model'], config['low'], config['high'])
+
+    def predict(self, images):
+        """1차원 foreigner_card_back 확률 배열"""
+        start = time.perf_counter()
+        images = np.asarray(images)
+        scores = self.small_predict(resize_batch(images, self.small_size)).astype(np.float32)
+
+        ambiguous = ~cascade_decision(scores, self.low, self.high)
+        if ambiguous.any():
+            scores[ambiguous] = self.large_predict(resize_batch(images[ambiguous], self.large_size))
+
+        with self._lock:
+            self.images += len(images)
+            self.forwarded += int(ambiguous.sum())
+            self.total_time += time.perf_counter() - start
+        return scores
+
+    def get_metrics(self):
+        with self._lock:
+            images = self.images
+            return {
+                'images': images,
+                'forwarded': self.forwarded,
+                'short_circuit_fraction': 1.0 - self.forwarded / images if images else 0.0,
+                'avg_time_per_image_ms': self.total_time / images * 1000.0 if images else 0.0,
+                'low': self.low,
+                'high': self.high
+            }
+
+def _collect_scores(small_predict, small_size, large_predict, large_size, data_dir, batch_size=32):
+    """
+    검증 데이터 전체의 (작은 모델 점수, 큰 모델 점수, 라벨)
+    CascadeClassifier.predict와 같게 큰 모델 크기로 디코딩한 뒤 작은 모델용으로 축소
+    (작은 크기로 바로 디코딩한 입력과는 분포가 달라 임계값이 어긋나지 않도록)
+    """
+    from data_utils import DataLoader
+
+    dataset = DataLoader(data_dir=data_dir, img_size=large_size, batch_size=batch_size).create_dataset('validation')
+    small_scores, large_scores, labels = [], [], []
+    for images, batch_labels in dataset:
+        images = images.numpy()
+        small_scores.append(small_predict(resize_batch(images, small_size)))
+        large_scores.append(large_predict(images))
+        labels.append(batch_labels.numpy())
+    return np.concatenate(small_scores), np.concatenate(large_scores), np.concatenate(labels)
+
+def calibrate_cascade(small_model_path, large_model_path, data_dir='data', max_accuracy_drop=0.0,
+                      threshold=0.5, output_path='models/cascade_config.json'):
+    """
+    검증 데이터에서 큰 모델 대비 정확도 하락이 max_accuracy_drop 이하인 구간 중
+    큰 모델로 보내는 비율이 가장 작은 (low, high) 선택
+    """
+    from benchmark_models import latency_percentiles
+
+    print("=== 캐스케이드 임계값 보정 (검증 데이터) ===")
+    small_predict, small_size = load_predictor(small_model_path)
+    large_predict, large_size = load_predictor(large_model_path)
+
+    small_scores, large_scores, labels = _collect_scores(small_predict, small_size, large_predict, large_size, data_dir)
+
+    large_correct = (large_scores > threshold) == labels.astype(bool)
+    large_accuracy = float(large_correct.mean())
+    small_accuracy = float(((small_scores > threshold) == labels.astype(bool)).mean())
+    target_accuracy = large_accuracy - max_accuracy_drop
+
+    # 후보 임계값: 작은 모델 점수의 분위수 (threshold 아래는 low, 위는 high 후보)
+    quantiles = np.linspace(0.0, 1.0, 101)
+    low_candidates = np.unique(np.concatenate([[0.0], np.quantile(small_scores, quantiles)]))
+    low_candidates = low_candidates[low_candidates < threshold]
+    high_candidates = np.unique(np.concatenate([[1.0], np.quantile(small_scores, quantiles)]))
+    high_candidates = high_candidates[high_candidates > threshold]
+
+    best = None
+    for low in low_candidates:
+        for high in high_candidates:
+            confident = cascade_decision(small_scores, low, high)
+            cascade_scores = np.where(confident, small_scores, large_scores)
+            accuracy = float(((cascade_scores > threshold) == labels.astype(bool)).mean())
+            forward_fraction = float(1.0 - confident.mean())
+            if accuracy < target_accuracy:
+                continue
+            candidate = (forward_fraction, -accuracy, float(low), float(high))
+            if best is None or candidate < best:
+                best = candidate
+
+    if best is None:
+        # 조건을 만족하는 구간이 없으면 전부 큰 모델로 전달
+        best = (1.0, -large_accuracy, -1.0, 2.0)
+    forward_fraction, negative_accuracy, low, high = best
+
+    # 평균 지연 = 작은 모델 + 전달 비율 × 큰 모델 (단일 이미지 p50 기준)
+    small_latency = latency_percentiles(small_predict, np.zeros((1,) + small_size + (3,), dtype=np.uint8))['p50_ms']
+    large_latency = latency_percentiles(large_predict, np.zeros((1,) + large_size + (3,), dtype=np.uint8))['p50_ms']
+
+    config = {
+        'small_model': small_model_path,
+        'large_model': large_model_path,
+        'low': low,
+        'high': high,
+        'calibration': {
+            'date': datetime.now().isoformat(),
+            'num_samples': int(len(labels)),
+            'max_accuracy_drop': max_accuracy_drop,
+            'small_accuracy': small_accuracy,
+            'large_accuracy': large_accuracy,
+            'cascade_accuracy': -negative_accuracy,
+            'short_circuit_fraction': 1.0 - forward_fraction,
+            'small_latency_ms': small_latency,
+            'large_latency_ms': large_latency,
+            'expected_latency_ms': small_latency + forward_fraction * large_latency
+        }
+    }
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+    calibration = config['calibration']
+    print(f"구간: ({low:.4f}, {high:.4f}) 밖은 작은 모델 결과 사용")
+    print(f"정확도: 작은 모델 {small_accuracy:.4f}, 큰 모델 {large_accuracy:.4f}, "
+          f"캐스케이드 {calibration['cascade_accuracy']:.4f}")
+    print(f"조기 종료 비율: {calibration['short_circuit_fraction'] * 100:.1f}%")
+    print(f"평균 지연: {calibration['expected_latency_ms']:.2f}ms (큰 모델만: {large_latency:.2f}ms)")
+    print(f"설정 저장됨: {output_path}")
+
+    return config
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='캐스케이드 임계값 보정')
+    parser.add_argument('--small_model', type=str, required=True, help='작은 모델 (예: compress_model.py 결과)')
+    parser.add_argument('--large_model', type=str, default='models/best_model.h5', help='큰 모델 (mobilenet)')
+    parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    parser.add_argument('--max_accuracy_drop', type=float, default=0.0, help='큰 모델 대비 허용 정확도 하락')
+    parser.add_argument('--output', type=str, default='models/cascade_config.json', help='설정 저장 경로')
+
+    args = parser.parse_args()
+
+    calibrate_cascade(
+        args.small_model,
+        args.large_model,
+        data_dir=args.data_dir,
+        max_accuracy_drop=args.max_accuracy_drop,
+        output_path=args.output
+    )
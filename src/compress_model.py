@@ -0,0 +1,283 @@
+"""
+모델 압축 스크립트 (지식 증류 + 구조적 채널 프루닝)
+훈련된 MobileNetV2 교사 모델을 폭을 줄인 efficient/custom 학생 모델로 증류하고,
+선택적으로 L1 노름이 작은 컨볼루션 채널을 제거한 뒤 다시 증류로 미세 조정
+결과는 evaluate_model과 같은 평가 + 지연 시간/크기로 교사와 비교
+"""
+import os
+import json
+import tempfile
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, Model
+from datetime import datetime
+
+from data_utils import DataLoader, augment_data
+from model import create_model
+from train_model import CONFIG, compile_model, evaluate_model
+from benchmark_models import artifact_size, latency_percentiles
+
+STUDENT_TYPES = ('efficient', 'custom')
+
+def _logits(probabilities):
+    """시그모이드 확률을 로짓으로 변환"""
+    p = tf.clip_by_value(tf.cast(probabilities, tf.float32), 1e-7, 1.0 - 1e-7)
+    return tf.math.log(p) - tf.math.log1p(-p)
+
+class Distiller(Model):
+    """
+    교사 모델의 온도 스케일 확률(soft target)과 정답 라벨을 함께 사용해 학생 모델 훈련
+    loss = alpha × BCE(라벨, 학생) + (1 - alpha) × T² × BCE(교사/T, 학생/T)
+    학생 입력 크기가 교사와 다르면 배치를 학생 크기로 리사이즈
+    """
+    def __init__(self, student: Model, teacher: Model, temperature: float = 4.0, alpha: float = 0.3):
+        super().__init__()
+        self.student = student
+        self.teacher = teacher
+        self.teacher.trainable = False
+        self.temperature = temperature
+        self.alpha = alpha
+        self.student_size = tuple(student.input_shape[1:3])
+        self.loss_tracker = tf.keras.metrics.Mean(name='loss')
+
+    @property
+    def metrics(self):
+        return [self.loss_tracker] + self.compiled_metrics.metrics
+
+    def _student_inputs(self, images):
+        if tuple(images.shape[1:3]) == self.student_size:
+            return images
+        return tf.saturate_cast(tf.round(tf.image.resize(images, self.student_size)), tf.uint8)
+
+    def call(self, images, training=False):
+        return self.student(self._student_inputs(images), training=training)
+
+    def _loss(self, labels, teacher_probs, student_probs, sample_weight):
+        labels = tf.reshape(tf.cast(labels, tf.float32), tf.shape(student_probs))
+        hard_loss = tf.keras.losses.binary_crossentropy(labels, tf.cast(student_probs, tf.float32))
+
+        soft_targets = tf.sigmoid(_logits(teacher_probs) / self.temperature)
+        soft_loss = tf.reduce_mean(tf.nn.sigmoid_cross_entropy_with_logits(
+            labels=soft_targets, logits=_logits(student_probs) / self.temperature), axis=-1)
+
+        loss = self.alpha * hard_loss + (1.0 - self.alpha) * (self.temperature ** 2) * soft_loss
+        if sample_weight is not None:
+            sample_weight = tf.cast(tf.reshape(sample_weight, tf.shape(loss)), loss.dtype)
+            return tf.reduce_sum(loss * sample_weight) / tf.reduce_sum(sample_weight)
+        return tf.reduce_mean(loss)
+
+    def train_step(self, data):
+        images, labels, sample_weight = tf.keras.utils.unpack_x_y_sample_weight(data)
+        teacher_probs = self.teacher(images, training=False)
+
+        with tf.GradientTape() as tape:
+            student_probs = self(images, training=True)
+            loss = self._loss(labels, teacher_probs, student_probs, sample_weight)
+
+        gradients = tape.gradient(loss, self.student.trainable_variables)
+        self.optimizer.apply_gradients(zip(gradients, self.student.trainable_variables))
+
+        self.loss_tracker.update_state(loss)
+        self.compiled_metrics.update_state(labels, student_probs, sample_weight)
+        return {metric.name: metric.result() for metric in self.metrics}
+
+    def test_step(self, data):
+        images, labels, sample_weight = tf.keras.utils.unpack_x_y_sample_weight(data)
+        student_probs = self(images, training=False)
+        labels_2d = tf.reshape(tf.cast(labels, tf.float32), tf.shape(student_probs))
+
+        self.loss_tracker.update_state(tf.keras.losses.binary_crossentropy(labels_2d, student_probs))
+        self.compiled_metrics.update_state(labels, student_probs, sample_weight)
+        return {metric.name: metric.result() for metric in self.metrics}
+
+def prune_channels(model: Model, prune_ratio: float) -> Model:
+    """
+    구조적 채널 프루닝: 각 Conv2D에서 L1 노름이 작은 출력 채널을 prune_ratio만큼 제거한 더 좁은 모델 생성
+    남은 채널의 가중치는 그대로 복사하고, 뒤따르는 BatchNormalization/Conv2D/Dense의 입력 차원도 맞춰 자름
+    레이어가 일렬로 연결된 모델(efficient, custom)만 지원
+    """
+    if any(isinstance(layer, Model) for layer in model.layers):
+        raise ValueError("중첩 모델(mobilenet 등)은 채널 프루닝을 지원하지 않습니다")
+
+    inputs = tf.keras.Input(shape=model.input_shape[1:])
+    x = inputs
+    keep = None  # 직전 레이어 출력에서 남긴 채널 인덱스
+
+    for layer in model.layers:
+        if isinstance(layer, layers.InputLayer):
+            continue
+
+        config = layer.get_config()
+        weights = layer.get_weights()
+
+        if isinstance(layer, layers.Conv2D):
+            kernel = weights[0] if keep is None else weights[0][:, :, keep, :]
+            num_filters = kernel.shape[-1]
+            num_keep = max(1, int(round(num_filters * (1.0 - prune_ratio))))
+            l1_norms = np.abs(kernel).sum(axis=(0, 1, 2))
+            keep = np.sort(np.argsort(l1_norms)[::-1][:num_keep])
+
+            weights = [kernel[..., keep]] + [bias[keep] for bias in weights[1:]]
+            config['filters'] = num_keep
+        elif isinstance(layer, layers.BatchNormalization) and keep is not None:
+            weights = [w[keep] for w in weights]
+        elif isinstance(layer, layers.Dense) and keep is not None:
+            weights = [weights[0][keep, :]] + weights[1:]
+            keep = None
+
+        new_layer = layer.__class__.from_config(config)
+        x = new_layer(x)
+        new_layer.set_weights(weights)
+
+    return Model(inputs, x, name=f'{model.name}_pruned')
+
+def distill(student, teacher, train_dataset, val_dataset, epochs, learning_rate, temperature, alpha,
+            class_weight=None):
+    """학생 모델을 증류로 훈련 (학생 가중치가 직접 갱신됨)"""
+    distiller = Distiller(student, teacher, temperature=temperature, alpha=alpha)
+    distiller.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        metrics=['accuracy']
+    )
+    return distiller.fit(
+        train_dataset,
+        validation_data=val_dataset,
+        epochs=epochs,
+        class_weight=class_weight,
+        callbacks=[tf.keras.callbacks.EarlyStopping(
+            monitor='val_accuracy', patience=CONFIG['early_stopping_patience'],
+            restore_best_weights=True, verbose=1
+        )],
+        verbose=1
+    )
+
+def model_footprint(model, num_runs=100):
+    """파라미터 수, .h5/TFLite 크기, 단일 이미지 지연 시간"""
+    from convert_to_tflite import convert_keras_model
+
+    img_size = tuple(model.input_shape[1:3])
+    image = np.random.randint(0, 256, size=(1,) + img_size + (3,), dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        h5_path = os.path.join(tmp_dir, 'model.h5')
+        model.save(h5_path)
+        h5_bytes = artifact_size(h5_path)
+    tflite_bytes = len(convert_keras_model(model, 'float32'))
+
+    return {
+        'img_size': list(img_size),
+        'params': model.count_params(),
+        'h5_bytes': h5_bytes,
+        'tflite_bytes': tflite_bytes,
+        'latency': latency_percentiles(model.predict_on_batch, image, num_runs)
+    }
+
+def compress_model(teacher_path, student_type='efficient', width_multiplier=0.5, student_img_size=None,
+                   prune_ratio=0.0, epochs=30, fine_tune_epochs=10, temperature=4.0, alpha=0.3,
+                   data_dir=None, output_dir=None):
+    """교사 모델을 학생 모델로 증류(+프루닝)하고 교사 대비 리포트 저장"""
+    data_dir = data_dir or CONFIG['data_dir']
+    output_dir = output_dir or CONFIG['model_dir']
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    print(f"교사 모델 로딩 중: {teacher_path}")
+    teacher = tf.keras.models.load_model(teacher_path, compile=False)
+    teacher_size = tuple(teacher.input_shape[1:3])
+    student_size = tuple(student_img_size) if student_img_size else teacher_size
+
+    # 교사 입력 크기로 읽고 학생 크기로는 Distiller 내부에서 리사이즈
+    data_loader = DataLoader(data_dir=data_dir, img_size=teacher_size, batch_size=CONFIG['batch_size'],
+                             cache=CONFIG['cache'])
+    train_dataset = data_loader.create_dataset('train')
+    if CONFIG['use_augmentation'] and CONFIG['augmentation_mode'] != 'model':
+        train_dataset = augment_data(train_dataset, mode=CONFIG['augmentation_mode'])
+    teacher_val_dataset = data_loader.create_dataset('validation')
+    class_weights = data_loader.get_class_weights('train')
+
+    print(f"=== 지식 증류: {student_type} (폭 ×{width_multiplier}, {student_size[0]}x{student_size[1]}) ===")
+    student = create_model(student_type, input_shape=student_size + (3,), width_multiplier=width_multiplier)
+    distill(student, teacher, train_dataset, teacher_val_dataset, epochs, CONFIG['learning_rate'],
+            temperature, alpha, class_weights)
+
+    if prune_ratio > 0:
+        print(f"=== 구조적 채널 프루닝 ({prune_ratio * 100:.0f}%) + 증류 미세 조정 ===")
+        before = student.count_params()
+        student = prune_channels(student, prune_ratio)
+        print(f"파라미터 수: {before:,} → {student.count_params():,}")
+        distill(student, teacher, train_dataset, teacher_val_dataset, fine_tune_epochs,
+                CONFIG['learning_rate'] * 0.1, temperature, alpha, class_weights)
+
+    # evaluate_model과 같은 지표로 비교 (학생은 자기 입력 크기의 검증 데이터 사용)
+    compile_model(teacher, jit_compile=False)
+    compile_model(student, jit_compile=False)
+    student_val_dataset = DataLoader(data_dir=data_dir, img_size=student_size,
+                                     batch_size=CONFIG['batch_size']).create_dataset('validation')
+
+    print("=== 교사 모델 ===")
+    teacher_report = evaluate_model(teacher, teacher_val_dataset, f'teacher_{timestamp}')
+    teacher_report.update(model_footprint(teacher))
+
+    print("=== 학생 모델 ===")
+    student_report = evaluate_model(student, student_val_dataset, f'student_{timestamp}')
+    student_report.update(model_footprint(student))
+
+    os.makedirs(output_dir, exist_ok=True)
+    student_path = os.path.join(output_dir, f'compressed_{student_type}_{timestamp}.h5')
+    student.save(student_path)
+
+    report = {
+        'teacher_path': teacher_path,
+        'student_path': student_path,
+        'student_type': student_type,
+        'width_multiplier': width_multiplier,
+        'prune_ratio': prune_ratio,
+        'temperature': temperature,
+        'alpha': alpha,
+        'teacher': teacher_report,
+        'student': student_report
+    }
+    report_path = os.path.join(output_dir, f'compression_report_{timestamp}.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n=== 압축 결과 (교사 → 학생) ===")
+    print(f"정확도: {teacher_report['val_accuracy']:.4f} → {student_report['val_accuracy']:.4f}")
+    print(f"F1: {teacher_report['f1_score']:.4f} → {student_report['f1_score']:.4f}")
+    print(f"파라미터: {teacher_report['params']:,} → {student_report['params']:,}")
+    print(f"TFLite 크기: {teacher_report['tflite_bytes'] / 1024 ** 2:.2f}MB → "
+          f"{student_report['tflite_bytes'] / 1024 ** 2:.2f}MB")
+    print(f"지연 p50: {teacher_report['latency']['p50_ms']:.2f}ms → {student_report['latency']['p50_ms']:.2f}ms")
+    print(f"학생 모델 저장됨: {student_path}")
+    print(f"리포트 저장됨: {report_path}")
+
+    return student_path, report
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='지식 증류 + 채널 프루닝 모델 압축')
+    parser.add_argument('--teacher_path', type=str, required=True, help='훈련된 교사 모델 (mobilenet .h5)')
+    parser.add_argument('--student_type', type=str, default='efficient', choices=STUDENT_TYPES)
+    parser.add_argument('--width_multiplier', type=float, default=0.5, help='학생 모델 폭 배율')
+    parser.add_argument('--student_img_size', type=int, default=None, help='학생 입력 크기 (기본: 교사와 동일)')
+    parser.add_argument('--prune_ratio', type=float, default=0.0, help='증류 후 제거할 채널 비율 (0이면 생략)')
+    parser.add_argument('--epochs', type=int, default=30, help='증류 에폭 수')
+    parser.add_argument('--fine_tune_epochs', type=int, default=10, help='프루닝 후 미세 조정 에폭 수')
+    parser.add_argument('--temperature', type=float, default=4.0, help='증류 온도')
+    parser.add_argument('--alpha', type=float, default=0.3, help='정답 라벨 손실 비중 (나머지는 교사 soft target)')
+    parser.add_argument('--data_dir', type=str, default=None, help='데이터 디렉토리')
+
+    args = parser.parse_args()
+
+    compress_model(
+        args.teacher_path,
+        student_type=args.student_type,
+        width_multiplier=args.width_multiplier,
+        student_img_size=(args.student_img_size, args.student_img_size) if args.student_img_size else None,
+        prune_ratio=args.prune_ratio,
+        epochs=args.epochs,
+        fine_tune_epochs=args.fine_tune_epochs,
+        temperature=args.temperature,
+        alpha=args.alpha,
+        data_dir=args.data_dir
+    )
@@ -2,12 +2,82 @@
 TensorFlow.js 변환 스크립트
 """
 import os
+import glob
+import tempfile
+import numpy as np
 import tensorflowjs as tfjs
 import tensorflow as tf
+from tensorflowjs.read_weights import read_weights
 import json
 from datetime import datetime
 
-def convert_to_tfjs(model_path, output_dir):
+QUANTIZATION_CHOICES = ('uint8', 'float16', 'none')
+OUTPUT_FORMATS = ('layers', 'graph')
+
+def build_quantization_map(quantization='float16', quantize_layers=None):
+    """
+    tfjs 변환기용 quantization_dtype_map 생성
+    quantize_layers가 있으면 해당 가중치 이름 패턴(와일드카드)에만 양자화 적용
+    (패턴은 변환기가 model.json weightsManifest의 이름에 맞춤, 예: "dense/kernel")
+    """
+    if quantization == 'none':
+        return None
+    return {quantization: list(quantize_layers) if quantize_layers else True}
+
+def converted_model(model, output_dir):
+    """
+    변환된 model.json의 가중치(tfjs가 양자화 해제한 값)를 그대로 넣은 모델 복제본 (Python 측 정확도 비교용)
+    layers 형식 전용 - 가중치 이름은 Keras 이름에서 ':0'을 뺀 값 (중첩 모델은 상위 모델 이름이 앞에 붙음)
+    """
+    with open(os.path.join(output_dir, 'model.json'), encoding='utf-8') as f:
+        manifest = json.load(f)['weightsManifest']
+    converted = {entry['name']: entry['data'] for entry in read_weights(manifest, output_dir, flatten=True)}
+
+    clone = tf.keras.models.clone_model(model)
+    clone.set_weights(model.get_weights())
+
+    unmatched = []
+    for source, weight in zip(model.weights, clone.weights):
+        name = source.name.rsplit(':', 1)[0]
+        candidates = [name] if name in converted else [key for key in converted if key.endswith('/' + name)]
+        if len(candidates) != 1:
+            unmatched.append(name)
+            continue
+        weight.assign(np.reshape(converted[candidates[0]], weight.shape).astype(weight.dtype.as_numpy_dtype))
+
+    if unmatched:
+        raise ValueError(f"변환된 가중치와 이름이 맞지 않는 가중치 {len(unmatched)}개: {unmatched[:5]}")
+    return clone
+
+def evaluate_quantized_accuracy(model, output_dir, quantization, data_dir):
+    """원본과 변환된(양자화) 가중치 모델의 검증 정확도 비교"""
+    from data_utils import DataLoader
+
+    img_size = tuple(model.input_shape[1:3])
+    val_dataset = DataLoader(data_dir=data_dir, img_size=img_size, batch_size=32).create_dataset('validation')
+
+    def accuracy(eval_model):
+        correct = total = 0
+        for images, labels in val_dataset:
+            scores = eval_model.predict_on_batch(images).reshape(-1)
+            correct += int(np.sum((scores > 0.5).astype(int) == labels.numpy()))
+            total += len(scores)
+        return (correct / total if total else 0.0), total
+
+    original, num_samples = accuracy(model)
+    quantized = original
+    if quantization != 'none':
+        quantized, _ = accuracy(converted_model(model, output_dir))
+    return {
+        'original': original,
+        'quantized': quantized,
+        'delta': quantized - original,
+        'num_samples': num_samples
+    }
+
+def convert_to_tfjs(model_path, output_dir, quantization='float16', quantize_layers=None,
+                    weight_shard_size_bytes=4 * 1024 * 1024, output_format='layers',
+                    data_dir=None):
     """TensorFlow 모델을 TensorFlow.js 형식으로 변환"""
     
     print(f"모델 로딩 중: {model_path}")
@@ -17,16 +87,36 @@ def convert_to_tfjs(model_path, output_dir):
     model.summary()
     
     # TensorFlow.js 변환
-    print(f"TensorFlow.js로 변환 중...")
+    print(f"TensorFlow.js로 변환 중... (형식: {output_format}, 양자화: {quantization})")
     print(f"출력 디렉토리: {output_dir}")
     
+    # 기존 샤드 정리 (샤드 수 집계가 정확하도록)
+    for old_shard in glob.glob(os.path.join(output_dir, 'group*-shard*')):
+        os.remove(old_shard)
+    
     # 양자화 옵션으로 모델 크기 줄이기
-    tfjs.converters.save_keras_model(
-        model, 
-        output_dir,
-        quantization_bytes=2,  # 16-bit 양자화로 모델 크기 줄이기
-        metadata={'description': 'Foreigner Card Back Classifier'}
-    )
+    quantization_map = build_quantization_map(quantization, quantize_layers)
+    metadata = {'description': 'Foreigner Card Back Classifier'}
+    
+    if output_format == 'graph':
+        # 그래프 모델: 추론 전용, 브라우저에서 tf.loadGraphModel로 로드
+        with tempfile.TemporaryDirectory() as saved_model_dir:
+            tf.saved_model.save(model, saved_model_dir)
+            tfjs.converters.convert_tf_saved_model(
+                saved_model_dir,
+                output_dir,
+                quantization_dtype_map=quantization_map,
+                weight_shard_size_bytes=weight_shard_size_bytes,
+                metadata=metadata
+            )
+    else:
+        tfjs.converters.save_keras_model(
+            model,
+            output_dir,
+            quantization_dtype_map=quantization_map,
+            weight_shard_size_bytes=weight_shard_size_bytes,
+            metadata=metadata
+        )
     
     print("변환 완료!")
     
@@ -34,17 +124,42 @@ def convert_to_tfjs(model_path, output_dir):
     files = os.listdir(output_dir)
     print(f"생성된 파일: {files}")
     
+    shard_files = glob.glob(os.path.join(output_dir, 'group*-shard*'))
+    total_bytes = sum(os.path.getsize(f) for f in shard_files + [os.path.join(output_dir, 'model.json')])
+    
     # 모델 정보 저장
     model_info = {
         'input_shape': model.input_shape,
+        'img_size': list(model.input_shape[1:3]),  # 클라이언트가 이 크기로 리사이즈 [높이, 너비]
         'output_shape': model.output_shape,
         'model_type': 'binary_classification',
         'classes': ['other_documents', 'foreigner_card_back'],
         'conversion_date': datetime.now().isoformat(),
-        'quantization': '16-bit',
+        'format': output_format,
+        'quantization': quantization,
+        'quantize_layers': list(quantize_layers) if quantize_layers else None,
+        'weight_shard_size_bytes': weight_shard_size_bytes,
+        'total_bytes': total_bytes,
+        'shard_count': len(shard_files),
+        'input_range': [0, 255],  # 리사이즈만 수행, 정규화는 모델 내부에서 처리
         'description': 'Binary classifier for foreigner card back detection'
     }
     
+    if data_dir and output_format == 'graph':
+        # 그래프 모델 가중치 이름은 Keras 가중치와 대응되지 않음
+        print("⚠️ graph 형식은 양자화 정확도 비교를 지원하지 않습니다 (layers 형식으로 변환해 비교)")
+    elif data_dir:
+        print("양자화 정확도 비교 중 (검증 데이터, 변환된 가중치 사용)...")
+        try:
+            model_info['accuracy'] = evaluate_quantized_accuracy(model, output_dir, quantization, data_dir)
+            print(f"정확도: 원본 {model_info['accuracy']['original']:.4f} → "
+                  f"양자화 {model_info['accuracy']['quantized']:.4f} "
+                  f"({model_info['accuracy']['delta']:+.4f})")
+        except ValueError as e:
+            print(f"⚠️ 양자화 정확도 비교 건너뜀: {e}")
+    
+    print(f"총 크기: {total_bytes / (1024 * 1024):.2f} MB (샤드 {len(shard_files)}개)")
+    
     info_path = os.path.join(output_dir, 'model_info.json')
     with open(info_path, 'w', encoding='utf-8') as f:
         json.dump(model_info, f, indent=2, ensure_ascii=False)
@@ -59,6 +174,15 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='TensorFlow.js 변환')
     parser.add_argument('--model_path', type=str, required=True, help='변환할 TensorFlow 모델 경로')
     parser.add_argument('--output_dir', type=str, default='models/tfjs_model', help='출력 디렉토리')
+    parser.add_argument('--quantization', type=str, default='float16', choices=QUANTIZATION_CHOICES,
+                        help='가중치 양자화 방식 (기본값: float16)')
+    parser.add_argument('--quantize_layers', type=str, nargs='+', default=None,
+                        help='양자화할 가중치 이름 패턴 (model.json weightsManifest 이름 기준, 예: "conv2d*" "dense/*"), 지정하지 않으면 전체')
+    parser.add_argument('--weight_shard_size_mb', type=float, default=4.0, help='가중치 샤드 크기 (MB)')
+    parser.add_argument('--format', type=str, default='layers', choices=OUTPUT_FORMATS,
+                        help='출력 형식 (layers: tf.loadLayersModel, graph: tf.loadGraphModel)')
+    parser.add_argument('--data_dir', type=str, default=None,
+                        help='지정 시 검증 데이터로 원본과 변환된 가중치의 정확도를 비교해 model_info.json에 기록 (layers 형식)')
     
     args = parser.parse_args()
     
@@ -66,11 +190,20 @@ if __name__ == "__main__":
     os.makedirs(args.output_dir, exist_ok=True)
     
     # TensorFlow.js 변환
-    tfjs_dir = convert_to_tfjs(args.model_path, args.output_dir)
+    tfjs_dir = convert_to_tfjs(
+        args.model_path,
+        args.output_dir,
+        quantization=args.quantization,
+        quantize_layers=args.quantize_layers,
+        weight_shard_size_bytes=int(args.weight_shard_size_mb * 1024 * 1024),
+        output_format=args.format,
+        data_dir=args.data_dir
+    )
     
+    loader = 'tf.loadGraphModel' if args.format == 'graph' else 'tf.loadLayersModel'
     print(f"\n=== 변환 완료 ===")
     print(f"TensorFlow.js 모델: {tfjs_dir}")
     print(f"\n웹에서 사용하는 방법:")
     print(f"1. 변환된 모델 파일들을 웹 서버에 업로드")
-    print(f"2. HTML에서 tf.loadLayersModel('경로/model.json')로 로드")
+    print(f"2. HTML에서 {loader}('경로/model.json')로 로드 (classifier.js는 model_info.json의 format으로 자동 선택)")
     print(f"3. 예측: model.predict(preprocessed_image_tensor)")
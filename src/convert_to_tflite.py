@@ -0,0 +1,166 @@
+"""
+TFLite 변환 스크립트 (float16, dynamic range, int8 양자화 + 크기/지연/정확도 비교 리포트)
+"""
+import os
+import json
+import time
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+from data_utils import DataLoader
+
+QUANTIZATION_TYPES = ('float32', 'float16', 'dynamic', 'int8')
+
+def representative_dataset_from(data_dir, img_size, num_samples=200):
+    """검증 데이터에서 int8 보정용 대표 데이터셋 생성"""
+    data_loader = DataLoader(data_dir=data_dir, img_size=img_size, batch_size=1)
+    dataset = data_loader.create_dataset('validation').take(num_samples)
+
+    def generator():
+        for images, _ in dataset:
+            yield [tf.cast(images, tf.float32)]
+
+    return generator
+
+def convert_keras_model(model, quantization='float32', representative_dataset=None):
+    """Keras 모델을 지정한 양자화 방식의 TFLite 바이트로 변환"""
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(f"지원하지 않는 양자화 방식: {quantization}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'dynamic':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif quantization == 'int8':
+        if representative_dataset is None:
+            raise ValueError("int8 양자화에는 대표 데이터셋이 필요합니다")
+        # 입출력까지 정수 연산 (입력은 0~255 uint8 이미지 그대로)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+
+    return converter.convert()
+
+def measure_latency(predict_fn, image, num_runs=50, warmup=5):
+    """단일 이미지 예측 지연 시간 중앙값 (ms)"""
+    for _ in range(warmup):
+        predict_fn(image)
+
+    timings = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        predict_fn(image)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+def evaluate_accuracy(predict_fn, dataset, threshold=0.5):
+    """검증 데이터 정확도"""
+    correct = 0
+    total = 0
+    for images, labels in dataset:
+        scores = np.asarray(predict_fn(images.numpy())).reshape(-1)
+        correct += int(np.sum((scores > threshold).astype(int) == labels.numpy()))
+        total += len(scores)
+    return correct / total if total else 0.0
+
+def convert_to_tflite(model_path, output_dir, quantizations=QUANTIZATION_TYPES,
+                      data_dir='data', num_calibration_samples=200, report=True):
+    """Keras 모델을 여러 양자화 방식의 TFLite로 변환하고 원본 대비 리포트 생성"""
+    from inference import TFLiteModel
+
+    print(f"모델 로딩 중: {model_path}")
+    model = tf.keras.models.load_model(model_path, compile=False)
+    img_size = tuple(model.input_shape[1:3])
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+
+    representative_dataset = None
+    if 'int8' in quantizations:
+        representative_dataset = representative_dataset_from(data_dir, img_size, num_calibration_samples)
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {}
+    for quantization in quantizations:
+        print(f"TFLite 변환 중... ({quantization})")
+        tflite_bytes = convert_keras_model(model, quantization, representative_dataset)
+        output_path = os.path.join(output_dir, f'{model_name}_{quantization}.tflite')
+        with open(output_path, 'wb') as f:
+            f.write(tflite_bytes)
+        outputs[quantization] = output_path
+        print(f"  저장됨: {output_path} ({len(tflite_bytes) / (1024 * 1024):.2f} MB)")
+
+    if not report:
+        return outputs
+
+    # 원본 Keras 모델과 비교
+    print("\n=== 리포트 생성 (검증 데이터) ===")
+    val_dataset = DataLoader(data_dir=data_dir, img_size=img_size, batch_size=32).create_dataset('validation')
+    sample = np.zeros((1,) + img_size + (3,), dtype=np.uint8)
+
+    keras_accuracy = evaluate_accuracy(model.predict_on_batch, val_dataset)
+    results = {
+        'keras': {
+            'path': model_path,
+            'size_bytes': os.path.getsize(model_path),
+            'latency_ms': measure_latency(model.predict_on_batch, sample),
+            'accuracy': keras_accuracy,
+            'accuracy_delta': 0.0
+        }
+    }
+
+    for quantization, output_path in outputs.items():
+        tflite_model = TFLiteModel(output_path, num_threads=1)
+        accuracy = evaluate_accuracy(tflite_model.predict, val_dataset)
+        results[quantization] = {
+            'path': output_path,
+            'size_bytes': os.path.getsize(output_path),
+            'latency_ms': measure_latency(tflite_model.predict, sample),
+            'accuracy': accuracy,
+            'accuracy_delta': accuracy - keras_accuracy
+        }
+
+    print(f"\n{'형식':<10}{'크기(MB)':>10}{'지연(ms)':>10}{'정확도':>10}{'차이':>10}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['size_bytes'] / (1024 * 1024):>10.2f}{result['latency_ms']:>10.2f}"
+              f"{result['accuracy']:>10.4f}{result['accuracy_delta']:>+10.4f}")
+
+    report_path = os.path.join(output_dir, f'{model_name}_tflite_report.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_path': model_path,
+            'input_shape': list(model.input_shape),
+            'report_date': datetime.now().isoformat(),
+            'num_calibration_samples': num_calibration_samples,
+            'results': results
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n리포트 저장됨: {report_path}")
+
+    return outputs
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='TFLite 변환')
+    parser.add_argument('--model_path', type=str, required=True, help='변환할 TensorFlow 모델 경로')
+    parser.add_argument('--output_dir', type=str, default='models/tflite', help='출력 디렉토리')
+    parser.add_argument('--quantization', type=str, nargs='+', default=list(QUANTIZATION_TYPES),
+                        choices=QUANTIZATION_TYPES, help='양자화 방식 (여러 개 지정 가능)')
+    parser.add_argument('--data_dir', type=str, default='data', help='보정/평가용 데이터 디렉토리')
+    parser.add_argument('--num_calibration_samples', type=int, default=200, help='int8 보정 샘플 수')
+    parser.add_argument('--no_report', action='store_true', help='크기/지연/정확도 리포트 생략')
+
+    args = parser.parse_args()
+
+    convert_to_tflite(
+        args.model_path,
+        args.output_dir,
+        quantizations=args.quantization,
+        data_dir=args.data_dir,
+        num_calibration_samples=args.num_calibration_samples,
+        report=not args.no_report
+    )
@@ -0,0 +1,297 @@
+"""
+데이터셋 인덱스 (SQLite manifest)
+분할/클래스 디렉토리를 매번 다시 훑지 않도록 이미지 경로, 라벨, 크기, mtime 등을 기록하고
+수정 시각이 바뀐 디렉토리만 다시 스캔해 갱신
+TensorFlow 없이 동작하므로 data_tools.py, run_pipeline.sh에서도 사용
+"""
+import os
+import time
+import sqlite3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+CLASS_LABELS = {'foreigner_card_back': 1, 'other_documents': 0}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')  # 프로젝트 공용 정의 (data_utils, data_tools, predict에서 사용)
+SPLITS = ('train', 'validation')
+INDEX_FILENAME = 'index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,      -- data_dir 기준 상대 경로
+    label INTEGER NOT NULL,
+    split TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS images_split ON images (split, label);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+# PRAGMA user_version 순서대로 적용하는 스키마 변경 (기존 인덱스 파일도 그대로 사용 가능)
+MIGRATIONS = [
+    # 1: 디코딩 검증 결과 (파일이 바뀌면 행이 교체되어 NULL로 돌아가므로 다시 검증됨)
+    """
+    ALTER TABLE images ADD COLUMN channels INTEGER;
+    ALTER TABLE images ADD COLUMN orientation INTEGER;
+    ALTER TABLE images ADD COLUMN decode_ms REAL;
+    ALTER TABLE images ADD COLUMN valid INTEGER;
+    ALTER TABLE images ADD COLUMN error TEXT;
+    """,
+    # 2: 격리된 손상 파일 (split 재실행 시 같은 원본이 다시 배치되지 않도록 제외 목록으로 사용)
+    """
+    CREATE TABLE IF NOT EXISTS quarantined (
+        path TEXT PRIMARY KEY,      -- data_dir 기준 상대 경로 (격리 전 위치)
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        error TEXT
+    );
+    """,
+    # 3: 인덱스에 처음 등록된 시각 (증분 훈련의 새 이미지 판별용 - 복사/하드링크로 유지되는 파일 mtime 대신 사용)
+    #    기존 행과 디렉토리 첫 스캔에서 발견된 파일은 NULL (이전부터 있던 이미지로 간주)
+    """
+    ALTER TABLE images ADD COLUMN first_seen REAL;
+    """,
+]
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 sha1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_metadata(path: str) -> Tuple[Optional[int], Optional[int], str]:
+    """이미지 헤더의 가로/세로 크기와 내용 해시 (PIL이 없으면 크기는 생략)"""
+    width = height = None
+    try:
+        from PIL import Image
+        with Image.open(path) as img:  # 헤더만 읽음
+            width, height = img.size
+    except Exception:
+        pass
+    return width, height, file_hash(path)
+
+class DatasetIndex:
+    """data_dir/{split}/{class}/ 구조의 이미지 인덱스"""
+
+    def __init__(self, data_dir: str, index_path: str = None):
+        self.data_dir = data_dir
+        self.index_path = index_path or os.path.join(data_dir, INDEX_FILENAME)
+        try:
+            self.conn = sqlite3.connect(self.index_path)
+        except sqlite3.OperationalError:
+            # 읽기 전용 위치 등 파일을 만들 수 없으면 메모리 인덱스 사용 (매번 전체 스캔)
+            self.conn = sqlite3.connect(':memory:')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for i, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            self.conn.executescript(migration)
+            self.conn.execute(f'PRAGMA user_version = {i}')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, splits=SPLITS, with_metadata: bool = False, full: bool = False,
+               num_workers: int = None) -> Dict[str, int]:
+        """
+        인덱스 갱신 - 수정 시각이 바뀐 디렉토리만 다시 스캔
+        (파일 추가/삭제/이름 변경은 디렉토리 mtime을 바꾸지만, 같은 이름으로 덮어쓴 경우는 full=True 필요)
+        with_metadata: 새/변경 파일의 이미지 크기와 내용 해시도 기록
+        """
+        stats = {'scanned_dirs': 0, 'added': 0, 'updated': 0, 'removed': 0}
+        known_dirs = dict(self.conn.execute('SELECT path, mtime_ns FROM directories'))
+
+        for split in splits:
+            for class_dir, label in CLASS_LABELS.items():
+                rel_dir = f'{split}/{class_dir}'
+                abs_dir = os.path.join(self.data_dir, split, class_dir)
+
+                if not os.path.isdir(abs_dir):
+                    if rel_dir in known_dirs:
+                        stats['removed'] += self.conn.execute(
+                            'DELETE FROM images WHERE split = ? AND label = ?', (split, label)).rowcount
+                        self.conn.execute('DELETE FROM directories WHERE path = ?', (rel_dir,))
+                    continue
+
+                dir_mtime = os.stat(abs_dir).st_mtime_ns
+                if not full and known_dirs.get(rel_dir) == dir_mtime:
+                    continue
+
+                self._scan_directory(rel_dir, abs_dir, split, label, stats, initial=rel_dir not in known_dirs)
+                self.conn.execute('INSERT OR REPLACE INTO directories VALUES (?, ?)', (rel_dir, dir_mtime))
+                stats['scanned_dirs'] += 1
+
+        if with_metadata:
+            self._fill_metadata(num_workers)
+
+        self.conn.commit()
+        return stats
+
+    def _scan_directory(self, rel_dir, abs_dir, split, label, stats, initial=False):
+        existing = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute(
+                'SELECT path, size, mtime_ns FROM images WHERE split = ? AND label = ?', (split, label))
+        }
+        first_seen = None if initial else time.time()
+
+        seen = set()
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(IMAGE_EXTENSIONS) or not entry.is_file():
+                    continue
+                rel_path = f'{rel_dir}/{entry.name}'
+                stat = entry.stat()
+                seen.add(rel_path)
+
+                previous = existing.get(rel_path)
+                if previous == (stat.st_size, stat.st_mtime_ns):
+                    continue
+
+                # 새 파일이거나 내용이 바뀐 파일: 메타데이터는 다시 계산 (처음 등록 시각은 유지)
+                if previous:
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO images (path, label, split, size, mtime_ns, first_seen) '
+                        'VALUES (?, ?, ?, ?, ?, (SELECT first_seen FROM images WHERE path = ?))',
+                        (rel_path, label, split, stat.st_size, stat.st_mtime_ns, rel_path)
+                    )
+                else:
+                    self.conn.execute(
+                        'INSERT INTO images (path, label, split, size, mtime_ns, first_seen) VALUES (?, ?, ?, ?, ?, ?)',
+                        (rel_path, label, split, stat.st_size, stat.st_mtime_ns, first_seen)
+                    )
+                stats['updated' if previous else 'added'] += 1
+
+        removed = [(path,) for path in existing if path not in seen]
+        self.conn.executemany('DELETE FROM images WHERE path = ?', removed)
+        stats['removed'] += len(removed)
+
+    def _fill_metadata(self, num_workers=None):
+        """크기/해시가 비어 있는 파일의 메타데이터를 병렬로 계산"""
+        missing = [path for (path,) in self.conn.execute('SELECT path FROM images WHERE hash IS NULL')]
+        if not missing:
+            return
+
+        with ThreadPoolExecutor(max_workers=num_workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+            results = executor.map(lambda path: _read_metadata(os.path.join(self.data_dir, path)), missing)
+            self.conn.executemany(
+                'UPDATE images SET width = ?, height = ?, hash = ? WHERE path = ?',
+                [(width, height, digest, path) for path, (width, height, digest) in zip(missing, results)]
+            )
+
+    def pending_validation(self) -> List[str]:
+        """아직 검증하지 않았거나 검증 후 바뀐 파일 경로"""
+        return [
+            os.path.join(self.data_dir, path)
+            for (path,) in self.conn.execute('SELECT path FROM images WHERE valid IS NULL ORDER BY path')
+        ]
+
+    def record_validation(self, results: List[dict]):
+        """검증 결과 기록 (results: validate 워커가 반환한 dict 목록)"""
+        self.conn.executemany(
+            'UPDATE images SET width = :width, height = :height, channels = :channels, '
+            'orientation = :orientation, decode_ms = :decode_ms, valid = :valid, error = :error '
+            'WHERE path = :path',
+            [dict(result, path=os.path.relpath(result['path'], self.data_dir).replace(os.sep, '/'))
+             for result in results]
+        )
+        self.conn.commit()
+
+    def invalid_files(self) -> List[Tuple[str, str]]:
+        """디코딩에 실패한 (경로, 오류) 목록"""
+        return [
+            (os.path.join(self.data_dir, path), error)
+            for path, error in self.conn.execute('SELECT path, error FROM images WHERE valid = 0 ORDER BY path')
+        ]
+
+    def record_quarantine(self, files: List[Tuple[str, str]]):
+        """격리할 (경로, 오류) 기록 - 파일을 옮기기 전에 호출 (크기/수정 시각으로 원본이 고쳐졌는지 판단)"""
+        rows = []
+        for path, error in files:
+            stat = os.stat(path)
+            rel_path = os.path.relpath(path, self.data_dir).replace(os.sep, '/')
+            rows.append((rel_path, stat.st_size, stat.st_mtime_ns, error))
+        self.conn.executemany('INSERT OR REPLACE INTO quarantined VALUES (?, ?, ?, ?)', rows)
+        self.conn.commit()
+
+    def quarantined(self) -> Dict[str, Tuple[int, int]]:
+        """{격리 전 경로: (크기, mtime_ns)}"""
+        return {
+            os.path.join(self.data_dir, path): (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute('SELECT path, size, mtime_ns FROM quarantined')
+        }
+
+    def files(self, split: str) -> Tuple[List[str], List[int]]:
+        """분할(split)의 (이미지 경로, 라벨) 목록 (경로 순 정렬, 손상 파일 제외)"""
+        # 디코딩 검증에서 실패한 파일은 제외 (훈련 중 decode 오류 방지)
+        rows = self.conn.execute(
+            'SELECT path, label FROM images WHERE split = ? AND valid IS NOT 0 ORDER BY path', (split,)).fetchall()
+        return [os.path.join(self.data_dir, path) for path, _ in rows], [label for _, label in rows]
+
+    def added_since(self, split: str, timestamp: float) -> List[str]:
+        """timestamp 이후 인덱스에 처음 등록된 이미지 경로 (손상 파일 제외)"""
+        return [
+            os.path.join(self.data_dir, path)
+            for (path,) in self.conn.execute(
+                'SELECT path FROM images WHERE split = ? AND valid IS NOT 0 AND first_seen > ? ORDER BY path',
+                (split, timestamp))
+        ]
+
+    def class_counts(self, split: str) -> Dict[int, int]:
+        """분할(split)의 라벨별 이미지 수"""
+        counts = {label: 0 for label in CLASS_LABELS.values()}
+        for label, count in self.conn.execute(
+                'SELECT label, COUNT(*) FROM images WHERE split = ? AND valid IS NOT 0 GROUP BY label', (split,)):
+            counts[label] = count
+        return counts
+
+    def records(self, split: str = None) -> List[dict]:
+        """인덱스 행 전체 (split 지정 시 해당 분할만)"""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            query = 'SELECT * FROM images' + (' WHERE split = ?' if split else '') + ' ORDER BY path'
+            return [dict(row) for row in self.conn.execute(query, (split,) if split else ())]
+        finally:
+            self.conn.row_factory = None
+
+def open_index(data_dir: str, index_path: str = None, **update_kwargs) -> DatasetIndex:
+    """인덱스를 열고 변경된 디렉토리만 갱신"""
+    index = DatasetIndex(data_dir, index_path)
+    index.update(**update_kwargs)
+    return index
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='데이터셋 인덱스 갱신')
+    parser.add_argument('--data_dir', type=str, default='data', help='데이터 디렉토리')
+    parser.add_argument('--with_metadata', action='store_true', help='이미지 크기/내용 해시도 기록')
+    parser.add_argument('--full', action='store_true', help='디렉토리 mtime과 무관하게 전체 재스캔')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with DatasetIndex(args.data_dir) as index:
+        stats = index.update(with_metadata=args.with_metadata, full=args.full)
+        print(f"인덱스 갱신 ({time.perf_counter() - start:.2f}초): {stats}")
+        for split in SPLITS:
+            print(f"  {split}: {index.class_counts(split)}")
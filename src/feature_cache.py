@@ -0,0 +1,115 @@
+"""
+MobileNet 백본 특징 캐시 (헤드만 빠르게 훈련하기 위한 사전 계산)
+고정된 백본을 데이터셋 전체에 한 번만 실행하고 풀링된 특징을 메모리 맵 .npy 파일로 저장
+"""
+import os
+import glob
+import hashlib
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import Model
+
+from data_utils import DataLoader, augment_data
+
+FEATURE_LAYER = 'global_pool'
+
+def split_feature_model(model: Model):
+    """분류 모델을 (특징 추출기, 헤드)로 분리 - 헤드 레이어는 원본 모델과 가중치 공유"""
+    pool = model.get_layer(FEATURE_LAYER)
+    extractor = Model(model.input, pool.output, name='feature_extractor')
+
+    head_input = tf.keras.Input(shape=pool.output.shape[1:], name='features')
+    x = head_input
+    for layer in model.layers[model.layers.index(pool) + 1:]:
+        x = layer(x)
+    head = Model(head_input, x, name='classifier_head')
+
+    return extractor, head
+
+def weights_hash(model: Model) -> str:
+    """모델 가중치 내용 해시 (--init_model 등으로 백본이 바뀌면 다른 캐시 사용)"""
+    hasher = hashlib.sha1()
+    for weight in model.get_weights():
+        hasher.update(np.ascontiguousarray(weight).tobytes())
+    return hasher.hexdigest()[:12]
+
+def extract_features(extractor: Model, data_loader: DataLoader, split: str,
+                     augment_repeats: int = 0, augmentation_mode: str = 'pipeline'):
+    """
+    특징을 캐시 파일로 저장하고 메모리 맵 배열로 반환
+    augment_repeats > 0이면 원본 1회 + 증강 N회 분량의 특징을 저장 (훈련 데이터용)
+    """
+    num_examples = data_loader.num_examples(split)
+    passes = 1 + augment_repeats
+    feature_dim = int(extractor.output.shape[-1])
+
+    # 파일 이름: features_{분할}_x{반복 수}_{데이터 키}_{가중치 해시}
+    split_prefix = os.path.join(data_loader.cache_dir, f'features_{split}_x{passes}_')
+    data_prefix = split_prefix + data_loader.cache_key(data_loader.source_files(split)) + '_'
+    cache_prefix = data_prefix + weights_hash(extractor)
+    features_path = cache_prefix + '_features.npy'
+    labels_path = cache_prefix + '_labels.npy'
+
+    if os.path.exists(features_path) and os.path.exists(labels_path):
+        print(f"  캐시된 특징 사용: {features_path}")
+        return np.load(features_path, mmap_mode='r'), np.load(labels_path, mmap_mode='r')
+
+    # 같은 분할/반복 수에서 데이터가 바뀌어 키가 달라진 이전 캐시만 정리
+    # (현재 데이터의 다른 백본 가중치 캐시와 다른 프로세스가 쓰는 중인 .tmp 파일은 유지)
+    os.makedirs(data_loader.cache_dir, exist_ok=True)
+    for stale in glob.glob(split_prefix + '*'):
+        if not stale.startswith(data_prefix) and not stale.endswith('.tmp'):
+            os.remove(stale)
+
+    total = num_examples * passes
+    features = np.lib.format.open_memmap(features_path + '.tmp', mode='w+', dtype=np.float32, shape=(total, feature_dim))
+    labels = np.zeros(total, dtype=np.int32)
+
+    offset = 0
+    for i in range(passes):
+        dataset = data_loader.create_dataset(split)
+        if i > 0:
+            # 'model' 모드는 훈련 모델 내부에서 증강하므로 augment_data가 데이터셋을 그대로 반환함
+            # 특징 추출은 헤드만 훈련하는 경로라 같은 증강 레이어를 파이프라인에서 적용
+            mode = 'pipeline' if augmentation_mode == 'model' else augmentation_mode
+            dataset = augment_data(dataset, mode=mode)
+
+        print(f"  특징 추출 중... ({split}, {i + 1}/{passes})")
+        for images, batch_labels in dataset:
+            batch_features = extractor.predict_on_batch(images)
+            end = offset + len(batch_features)
+            features[offset:end] = batch_features
+            labels[offset:end] = batch_labels.numpy()
+            offset = end
+
+    features.flush()
+    del features
+    # 일부 파일이 읽히지 않았을 경우를 대비해 실제 개수만큼만 사용
+    np.save(labels_path, labels[:offset])
+    os.replace(features_path + '.tmp', features_path)
+
+    return np.load(features_path, mmap_mode='r')[:offset], np.load(labels_path, mmap_mode='r')
+
+def train_head_on_features(model: Model, data_loader: DataLoader, compile_fn, epochs: int,
+                           class_weight=None, augment_repeats: int = 0, augmentation_mode: str = 'pipeline'):
+    """캐시된 특징으로 분류 헤드만 훈련 (헤드 가중치는 원본 모델에 그대로 반영됨)"""
+    extractor, head = split_feature_model(model)
+
+    print("=== 백본 특징 캐시 생성 ===")
+    train_features, train_labels = extract_features(extractor, data_loader, 'train', augment_repeats, augmentation_mode)
+    val_features, val_labels = extract_features(extractor, data_loader, 'validation')
+    print(f"  훈련 특징: {train_features.shape}, 검증 특징: {val_features.shape}")
+
+    print(f"=== 헤드 훈련 ({epochs} 에폭) ===")
+    compile_fn(head)
+    history = head.fit(
+        train_features,
+        train_labels,
+        validation_data=(val_features, val_labels),
+        batch_size=data_loader.batch_size,
+        epochs=epochs,
+        class_weight=class_weight,
+        shuffle=True,
+        verbose=1
+    )
+    return history
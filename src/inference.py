@@ -0,0 +1,179 @@
+"""
+서버 사이드 추론 유틸리티 (모델 로딩, 이미지 디코딩, 동적 마이크로 배칭)
+"""
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from data_utils import decode_and_resize
+
+def load_classifier(model_path: str) -> Tuple[tf.keras.Model, Tuple[int, int]]:
+    """모델과 입력 이미지 크기 로드"""
+    model = tf.keras.models.load_model(model_path, compile=False)
+    img_size = tuple(model.input_shape[1:3])
+
+    # 첫 요청이 그래프 생성 비용을 떠안지 않도록 워밍업
+    model.predict_on_batch(np.zeros((1,) + img_size + (3,), dtype=np.uint8))
+    return model, img_size
+
+def decode_image_bytes(image_bytes: bytes, img_size: Tuple[int, int]) -> np.ndarray:
+    """업로드된 이미지 바이트를 uint8 배열로 디코딩 및 리사이즈"""
+    return decode_and_resize(tf.constant(image_bytes), img_size).numpy()
+
+def export_tflite(model_path: str, output_path: str = None) -> str:
+    """
+    Keras 모델을 float32 TFLite 파일로 변환 (이미 최신이면 재사용)
+    TFLite 인터프리터는 파일을 메모리 맵으로 읽으므로 여러 프로세스가 같은 가중치 페이지를 공유
+    """
+    if model_path.endswith('.tflite'):
+        return model_path
+
+    output_path = output_path or os.path.splitext(model_path)[0] + '.tflite'
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(model_path):
+        return output_path
+
+    from convert_to_tflite import convert_keras_model
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    with open(output_path, 'wb') as f:
+        f.write(convert_keras_model(model, 'float32'))
+    return output_path
+
+class TFLiteModel:
+    """
+    배치 크기가 바뀌면 입력 텐서를 재할당하는 TFLite 분류기 래퍼
+    int8 양자화 모델은 입력 양자화/출력 역양자화를 내부에서 처리
+    """
+    def __init__(self, model_path: str, num_threads: int = None):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self.img_size = tuple(int(d) for d in self.input_detail['shape'][1:3])
+        self._batch_size = int(self.input_detail['shape'][0])
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        batch_size = len(images)
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(
+                self.input_detail['index'], [batch_size, *self.img_size, 3]
+            )
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+        self.interpreter.set_tensor(self.input_detail['index'], self._quantize_input(images))
+        self.interpreter.invoke()
+        return self._dequantize_output(self.interpreter.get_tensor(self.output_detail['index']))
+
+    def _quantize_input(self, images: np.ndarray) -> np.ndarray:
+        dtype = self.input_detail['dtype']
+        scale, zero_point = self.input_detail['quantization']
+        if not np.issubdtype(dtype, np.integer) or scale == 0:
+            return images.astype(dtype)
+
+        info = np.iinfo(dtype)
+        quantized = np.round(images.astype(np.float32) / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(dtype)
+
+    def _dequantize_output(self, output: np.ndarray) -> np.ndarray:
+        scale, zero_point = self.output_detail['quantization']
+        if not np.issubdtype(output.dtype, np.integer) or scale == 0:
+            return output
+        return (output.astype(np.float32) - zero_point) * scale
+
+class MicroBatcher:
+    """
+    요청을 큐에 모아 마이크로 배치로 묶어 하나의 모델로 예측
+    첫 요청 도착 후 max_wait_ms 안에 들어온 요청을 최대 max_batch_size까지 묶음
+    num_threads > 1이면 여러 배치를 동시에 예측 (워커 풀처럼 predict_fn이 병렬 처리 가능한 경우)
+    """
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 10.0, num_threads: int = 1):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.num_threads = num_threads
+        self.requests = queue.Queue()
+        self._threads = []
+        self._running = False
+
+        # 배치 통계
+        self._lock = threading.Lock()
+        self.num_batches = 0
+        self.num_requests = 0
+
+    def start(self):
+        self._running = True
+        for i in range(self.num_threads):
+            thread = threading.Thread(target=self._run, name=f'micro-batcher-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, image: np.ndarray) -> Future:
+        """이미지 하나를 큐에 넣고 결과(점수)를 받을 Future 반환"""
+        future = Future()
+        self.requests.put((image, future))
+        return future
+
+    def predict(self, image: np.ndarray, timeout: float = 30.0) -> float:
+        """이미지 하나의 점수를 동기적으로 반환"""
+        return self.submit(image).result(timeout=timeout)
+
+    def _collect_batch(self) -> List[Tuple[np.ndarray, Future]]:
+        try:
+            batch = [self.requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            images = np.stack([image for image, _ in batch])
+            try:
+                scores = np.asarray(self.predict_fn(images)).reshape(len(batch), -1)[:, 0]
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), score in zip(batch, scores):
+                future.set_result(float(score))
+
+            with self._lock:
+                self.num_batches += 1
+                self.num_requests += len(batch)
+
+    def get_metrics(self) -> dict:
+        return {
+            'batches': self.num_batches,
+            'requests': self.num_requests,
+            'avg_batch_size': self.num_requests / self.num_batches if self.num_batches else 0.0,
+            'queue_size': self.requests.qsize()
+        }
@@ -0,0 +1,54 @@
+"""
+로컬 멀티 워커 분산 훈련 실행 스크립트
+한 머신에서 여러 프로세스에 TF_CONFIG를 지정해 MultiWorkerMirroredStrategy 훈련을 실행/테스트
+여러 호스트에서는 각 호스트에 같은 cluster 목록과 자신의 task index로 TF_CONFIG를 지정하면 됨
+"""
+import os
+import sys
+import json
+import subprocess
+
+def build_tf_config(num_workers, index, base_port=12345, host='localhost'):
+    """워커 index용 TF_CONFIG 생성"""
+    return {
+        'cluster': {
+            'worker': [f'{host}:{base_port + i}' for i in range(num_workers)]
+        },
+        'task': {'type': 'worker', 'index': index}
+    }
+
+def launch(num_workers, base_port=12345, threads_per_worker=None, extra_args=None):
+    """워커 프로세스를 띄우고 모두 끝날 때까지 대기 (하나라도 실패하면 0이 아닌 코드 반환)"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'train_model.py')
+    processes = []
+
+    for index in range(num_workers):
+        env = os.environ.copy()
+        env['TF_CONFIG'] = json.dumps(build_tf_config(num_workers, index, base_port))
+        if threads_per_worker:
+            # 같은 머신의 워커끼리 코어를 나눠 쓰도록 스레드 수 제한
+            env['TF_NUM_INTRAOP_THREADS'] = str(threads_per_worker)
+            env['TF_NUM_INTEROP_THREADS'] = '1'
+
+        command = [sys.executable, script, '--distribution_strategy', 'multi_worker'] + (extra_args or [])
+        print(f"🚀 워커 {index} 시작: {env['TF_CONFIG']}")
+        processes.append(subprocess.Popen(command, env=env))
+
+    return_codes = [process.wait() for process in processes]
+    for index, code in enumerate(return_codes):
+        status = "✅" if code == 0 else "❌"
+        print(f"{status} 워커 {index} 종료 코드: {code}")
+
+    return max(return_codes, key=abs)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='로컬 멀티 워커 분산 훈련')
+    parser.add_argument('--num_workers', type=int, default=2, help='워커 프로세스 수')
+    parser.add_argument('--base_port', type=int, default=12345, help='첫 번째 워커 포트')
+    parser.add_argument('--threads_per_worker', type=int, default=None, help='워커당 연산 스레드 수')
+
+    args, train_args = parser.parse_known_args()
+
+    sys.exit(launch(args.num_workers, args.base_port, args.threads_per_worker, train_args))
@@ -1,5 +1,8 @@
 """
 외국인등록증 뒷면 분류 모델 정의
+
+입력 계약: 모든 모델은 0~255 범위의 RGB 이미지(uint8 텐서 가능)를 입력으로 받으며
+정규화는 모델 내부에서 수행한다. 데이터 로더, 서버, 브라우저는 리사이즈만 수행한다.
 """
 import tensorflow as tf
 from tensorflow.keras import layers, Model
@@ -29,119 +32,159 @@ def create_mobilenet_classifier(
     # 입력 레이어
     inputs = tf.keras.Input(shape=input_shape)
     
-    # 전처리
+    # 전처리 (0~255 → -1~1)
     x = tf.keras.applications.mobilenet_v2.preprocess_input(inputs)
     
     # 백본 모델
     x = base_model(x, training=False)
     
-    # 분류 헤드
-    x = layers.GlobalAveragePooling2D()(x)
+    # 분류 헤드 (feature_cache 모드는 'global_pool' 출력을 특징으로 캐시)
+    x = layers.GlobalAveragePooling2D(name='global_pool')(x)
     x = layers.Dropout(0.2)(x)
     x = layers.Dense(128, activation='relu')(x)
     x = layers.Dropout(0.2)(x)
     
     if num_classes == 2:
         # 이진 분류
-        outputs = layers.Dense(1, activation='sigmoid', name='predictions')(x)
+        outputs = layers.Dense(1, activation='sigmoid', name='predictions', dtype='float32')(x)
     else:
         # 다중 분류
-        outputs = layers.Dense(num_classes, activation='softmax', name='predictions')(x)
+        outputs = layers.Dense(num_classes, activation='softmax', name='predictions', dtype='float32')(x)
     
     model = Model(inputs, outputs)
     return model
 
+def scaled_width(units: int, width_multiplier: float = 1.0, minimum: int = 8) -> int:
+    """폭 배율을 적용한 필터/유닛 수 (8의 배수로 맞춤)"""
+    return max(minimum, int(round(units * width_multiplier / 8.0)) * 8)
+
 def create_custom_cnn_classifier(
     input_shape: Tuple[int, int, int] = (224, 224, 3),
-    num_classes: int = 2
+    num_classes: int = 2,
+    width_multiplier: float = 1.0
 ) -> Model:
     """
     커스텀 CNN 분류 모델 (더 가벼운 모델)
+    width_multiplier: 모든 컨볼루션/Dense 폭 배율 (지식 증류용 작은 학생 모델 등)
     """
+    def w(units):
+        return scaled_width(units, width_multiplier)
+    
     model = tf.keras.Sequential([
         layers.Input(shape=input_shape),
         
+        # 정규화 (0~255 → 0~1)
+        layers.Rescaling(1./255),
+        
         # 첫 번째 컨볼루션 블록
-        layers.Conv2D(32, (3, 3), activation='relu'),
+        layers.Conv2D(w(32), (3, 3), activation='relu'),
         layers.BatchNormalization(),
         layers.MaxPooling2D((2, 2)),
         
         # 두 번째 컨볼루션 블록
-        layers.Conv2D(64, (3, 3), activation='relu'),
+        layers.Conv2D(w(64), (3, 3), activation='relu'),
         layers.BatchNormalization(),
         layers.MaxPooling2D((2, 2)),
         
         # 세 번째 컨볼루션 블록
-        layers.Conv2D(128, (3, 3), activation='relu'),
+        layers.Conv2D(w(128), (3, 3), activation='relu'),
         layers.BatchNormalization(),
         layers.MaxPooling2D((2, 2)),
         
         # 네 번째 컨볼루션 블록
-        layers.Conv2D(256, (3, 3), activation='relu'),
+        layers.Conv2D(w(256), (3, 3), activation='relu'),
         layers.BatchNormalization(),
         layers.MaxPooling2D((2, 2)),
         
         # 분류 헤드
         layers.GlobalAveragePooling2D(),
         layers.Dropout(0.5),
-        layers.Dense(128, activation='relu'),
+        layers.Dense(w(128), activation='relu'),
         layers.Dropout(0.3),
         
-        # 출력 레이어
+        # 출력 레이어 (혼합 정밀도에서도 float32로 출력)
         layers.Dense(1 if num_classes == 2 else num_classes, 
                     activation='sigmoid' if num_classes == 2 else 'softmax',
-                    name='predictions')
+                    name='predictions', dtype='float32')
     ])
     
     return model
 
 def create_efficient_classifier(
     input_shape: Tuple[int, int, int] = (224, 224, 3),
-    num_classes: int = 2
+    num_classes: int = 2,
+    width_multiplier: float = 1.0
 ) -> Model:
     """
     TensorFlow.js 최적화를 위한 효율적인 분류 모델
+    width_multiplier: 모든 컨볼루션/Dense 폭 배율 (지식 증류용 작은 학생 모델 등)
     """
+    def w(units):
+        return scaled_width(units, width_multiplier)
+    
     inputs = tf.keras.Input(shape=input_shape)
     
-    # 정규화
+    # 정규화 (0~255 → 0~1)
     x = layers.Rescaling(1./255)(inputs)
     
     # 첫 번째 블록
-    x = layers.Conv2D(16, 3, padding='same', activation='relu')(x)
+    x = layers.Conv2D(w(16), 3, padding='same', activation='relu')(x)
     x = layers.BatchNormalization()(x)
     x = layers.MaxPooling2D()(x)
     
     # 두 번째 블록
-    x = layers.Conv2D(32, 3, padding='same', activation='relu')(x)
+    x = layers.Conv2D(w(32), 3, padding='same', activation='relu')(x)
     x = layers.BatchNormalization()(x)
     x = layers.MaxPooling2D()(x)
     
     # 세 번째 블록
-    x = layers.Conv2D(64, 3, padding='same', activation='relu')(x)
+    x = layers.Conv2D(w(64), 3, padding='same', activation='relu')(x)
     x = layers.BatchNormalization()(x)
     x = layers.MaxPooling2D()(x)
     
     # 네 번째 블록
-    x = layers.Conv2D(128, 3, padding='same', activation='relu')(x)
+    x = layers.Conv2D(w(128), 3, padding='same', activation='relu')(x)
     x = layers.BatchNormalization()(x)
     x = layers.MaxPooling2D()(x)
     
     # 분류 헤드
     x = layers.GlobalAveragePooling2D()(x)
     x = layers.Dropout(0.2)(x)
-    x = layers.Dense(64, activation='relu')(x)
+    x = layers.Dense(w(64), activation='relu')(x)
     x = layers.Dropout(0.2)(x)
     
     # 출력
     if num_classes == 2:
-        outputs = layers.Dense(1, activation='sigmoid', name='predictions')(x)
+        outputs = layers.Dense(1, activation='sigmoid', name='predictions', dtype='float32')(x)
     else:
-        outputs = layers.Dense(num_classes, activation='softmax', name='predictions')(x)
+        outputs = layers.Dense(num_classes, activation='softmax', name='predictions', dtype='float32')(x)
     
     model = Model(inputs, outputs, name='foreigner_card_classifier')
     return model
 
+MODEL_BUILDERS = {
+    'mobilenet': create_mobilenet_classifier,
+    'efficient': create_efficient_classifier,
+    'custom': create_custom_cnn_classifier,
+}
+
+def create_model(model_type: str, input_shape: Tuple[int, int, int] = (224, 224, 3), num_classes: int = 2,
+                 **kwargs) -> Model:
+    """모델 타입 이름으로 분류 모델 생성 (kwargs는 빌더별 옵션, 예: width_multiplier)"""
+    if model_type not in MODEL_BUILDERS:
+        raise ValueError(f"지원하지 않는 모델 타입: {model_type}")
+    return MODEL_BUILDERS[model_type](input_shape=input_shape, num_classes=num_classes, **kwargs)
+
+def with_augmentation(model: Model, augmentation: tf.keras.layers.Layer) -> Model:
+    """
+    증강 레이어를 앞에 붙인 훈련용 모델 생성
+    가중치는 원본 모델과 공유하므로 배포/저장은 원본 모델로 수행
+    """
+    inputs = tf.keras.Input(shape=model.input_shape[1:])
+    x = augmentation(inputs)
+    outputs = model(x)
+    return Model(inputs, outputs, name=f'{model.name}_training')
+
 def get_model_summary(model: Model) -> None:
     """모델 요약 정보 출력"""
     print("모델 구조:")
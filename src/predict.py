@@ -0,0 +1,234 @@
+"""
+배치 추론 스크립트
+디렉토리/파일 목록의 이미지를 스트리밍으로 분류하고 결과를 CSV/JSONL로 순차 기록
+"""
+import os
+import csv
+import json
+import time
+import tensorflow as tf
+
+from data_utils import CLASS_NAMES, IMAGE_EXTENSIONS, decode_and_resize
+
+def iter_image_paths(inputs, file_list=None):
+    """입력 경로(디렉토리/이미지 파일)와 파일 목록에서 이미지 경로를 하나씩 생성"""
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            for root, dirs, files in os.walk(input_path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif input_path.lower().endswith(IMAGE_EXTENSIONS):
+            yield input_path
+        else:
+            print(f"⚠️ 이미지가 아닌 입력 건너뜀: {input_path}")
+
+    if file_list:
+        # 한 줄에 경로 하나
+        with open(file_list, encoding='utf-8') as f:
+            for line in f:
+                path = line.strip()
+                if path:
+                    yield path
+
+def create_predict_dataset(path_generator, img_size, batch_size, with_bytes=False):
+    """
+    경로 스트림 → 병렬 디코딩 → (경로, 캐시 키, 이미지) 배치 데이터셋
+    with_bytes: 생성기가 (경로, 캐시 키, 파일 내용)을 내보냄 (결과 캐시 조회 시 이미 읽은 내용을 다시 읽지 않음)
+    """
+    if with_bytes:
+        dataset = tf.data.Dataset.from_generator(
+            path_generator,
+            output_signature=(tf.TensorSpec(shape=(), dtype=tf.string),) * 3
+        )
+        dataset = dataset.map(
+            lambda path, key, data: (path, key, decode_and_resize(data, img_size)),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=False
+        )
+    else:
+        dataset = tf.data.Dataset.from_generator(
+            path_generator,
+            output_signature=tf.TensorSpec(shape=(), dtype=tf.string)
+        )
+        dataset = dataset.map(
+            lambda path: (path, tf.constant(''), decode_and_resize(tf.io.read_file(path), img_size)),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=False
+        )
+    # 손상된 파일은 건너뛰고 계속 진행
+    dataset = dataset.ignore_errors(log_warning=True)
+    dataset = dataset.batch(batch_size)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+class ResultWriter:
+    """결과를 배치마다 CSV 또는 JSONL로 기록 (확장자로 형식 결정)"""
+    FIELDS = ['path', 'label', 'class_name', 'score', 'confidence']
+
+    def __init__(self, output_path):
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        self.format = 'jsonl' if output_path.lower().endswith(('.jsonl', '.json')) else 'csv'
+        self.file = open(output_path, 'w', encoding='utf-8', newline='')
+
+        if self.format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+            self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.format == 'csv':
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def make_result(path, score, threshold=0.5):
+    """foreigner_card_back 확률로 결과 행 생성"""
+    label = int(score > threshold)
+    return {
+        'path': path,
+        'label': label,
+        'class_name': CLASS_NAMES[label],
+        'score': round(float(score), 6),
+        'confidence': round(float(score if label else 1 - score), 6)
+    }
+
+def predict(model_path, inputs, output_path, batch_size=64, threshold=0.5, file_list=None,
+            cascade_config=None, cache_size=0, cache_path=None):
+    """
+    모델을 한 번 로드하고 입력 전체를 스트리밍 추론
+    cascade_config: 지정 시 작은 모델이 확신하지 못한 이미지만 큰 모델로 분류 (cascade.py로 보정)
+    cache_size/cache_path: 이미지 내용 해시 결과 캐시 (캐시된 파일은 디코딩/예측 생략)
+    """
+    cascade = None
+    if cascade_config:
+        from cascade import CascadeClassifier
+        print(f"캐스케이드 로딩 중: {cascade_config}")
+        cascade = CascadeClassifier.from_config(cascade_config)
+        img_size = cascade.img_size
+        predict_batch = cascade.predict
+        version_paths = [cascade_config, cascade.small_model_path, cascade.large_model_path]
+    else:
+        print(f"모델 로딩 중: {model_path}")
+        model = tf.keras.models.load_model(model_path, compile=False)
+        img_size = tuple(model.input_shape[1:3])
+        predict_batch = lambda images: model.predict_on_batch(images)[:, 0]
+        version_paths = [model_path]
+    print(f"입력 크기: {img_size}")
+
+    cache = None
+    if cache_size > 0 or cache_path:
+        from result_cache import ResultCache, model_version
+        # 모델 파일 내용이 바뀌면 버전이 달라져 이전 결과는 무효화
+        version = '-'.join(model_version(path) for path in version_paths)
+        cache = ResultCache(version, max(cache_size, 1), cache_path)
+
+    listed = [0]
+    cached_rows = []   # 캐시 히트 결과 (메인 루프에서 기록)
+
+    def path_generator():
+        for path in iter_image_paths(inputs, file_list):
+            listed[0] += 1
+            if cache is None:
+                yield path
+                continue
+
+            # 한 번 읽은 내용으로 해시를 만들고 캐시 미스면 그대로 디코딩에 넘김 (캐시 키는 결과와 함께 전달)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                print(f"⚠️ 파일을 읽을 수 없음: {path} ({e})")
+                continue
+            key = cache.key(data)
+            score = cache.get(key)
+            if score is not None:
+                cached_rows.append(make_result(path, score, threshold))
+                continue
+            yield path, key, data
+
+    dataset = create_predict_dataset(path_generator, img_size, batch_size, with_bytes=cache is not None)
+    writer = ResultWriter(output_path)
+
+    processed = 0
+    start = time.perf_counter()
+
+    def flush_cached():
+        # 생성기 스레드가 계속 추가하므로 현재까지 쌓인 만큼만 꺼내서 기록
+        count = len(cached_rows)
+        if count:
+            writer.write(cached_rows[:count])
+            del cached_rows[:count]
+        return count
+
+    try:
+        for paths, keys, images in dataset:
+            scores = predict_batch(images)
+            paths = [path.decode('utf-8') for path in paths.numpy()]
+            writer.write([make_result(path, score, threshold) for path, score in zip(paths, scores)])
+            if cache is not None:
+                # 배치 단위로 한 번에 기록 (디스크 캐시는 배치당 커밋 한 번)
+                cache.put_many(zip((key.decode('utf-8') for key in keys.numpy()), scores))
+
+            processed += len(scores) + flush_cached()
+            if processed % (batch_size * 20) < batch_size:
+                elapsed = time.perf_counter() - start
+                print(f"  {processed}장 처리 ({processed / elapsed:.1f}장/초)")
+        processed += flush_cached()
+    finally:
+        writer.close()
+        if cache is not None:
+            cache.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n=== 추론 완료 ===")
+    print(f"처리: {processed}장, 건너뜀(손상): {listed[0] - processed}장")
+    print(f"소요 시간: {elapsed:.1f}초 ({processed / elapsed if elapsed > 0 else 0:.1f}장/초)")
+    if cascade:
+        metrics = cascade.get_metrics()
+        print(f"캐스케이드: 작은 모델에서 종료 {metrics['short_circuit_fraction'] * 100:.1f}%, "
+              f"이미지당 평균 {metrics['avg_time_per_image_ms']:.2f}ms")
+    if cache:
+        metrics = cache.get_metrics()
+        print(f"결과 캐시: 히트 {metrics['hits']}장 ({metrics['hit_rate'] * 100:.1f}%, 디스크 {metrics['disk_hits']}장)")
+    print(f"결과 저장됨: {output_path}")
+
+    return processed
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='배치 추론')
+    parser.add_argument('inputs', nargs='*', help='이미지 파일 또는 디렉토리 (하위 디렉토리 포함)')
+    parser.add_argument('--model_path', type=str, default='models/best_model.h5', help='모델 경로')
+    parser.add_argument('--file_list', type=str, default=None, help='이미지 경로 목록 파일 (한 줄에 하나)')
+    parser.add_argument('--output', type=str, default='predictions.csv', help='결과 파일 (.csv 또는 .jsonl)')
+    parser.add_argument('--batch_size', type=int, default=64, help='배치 크기')
+    parser.add_argument('--threshold', type=float, default=0.5, help='분류 임계값')
+    parser.add_argument('--cascade_config', type=str, default=None,
+                        help='캐스케이드 설정 (cascade.py로 생성, 지정 시 --model_path 대신 사용)')
+    parser.add_argument('--cache_size', type=int, default=0,
+                        help='결과 캐시 최대 항목 수 (기본값 0: 사용 안 함, 같은 파일을 반복 처리할 때 지정)')
+    parser.add_argument('--cache_path', type=str, default=None,
+                        help='결과 캐시 SQLite 파일 (지정 시 실행 간 재사용, 예: models/result_cache.sqlite)')
+
+    args = parser.parse_args()
+
+    if not args.inputs and not args.file_list:
+        parser.error('inputs 또는 --file_list 중 하나는 필요합니다')
+
+    predict(
+        args.model_path,
+        args.inputs,
+        args.output,
+        batch_size=args.batch_size,
+        threshold=args.threshold,
+        file_list=args.file_list,
+        cascade_config=args.cascade_config,
+        cache_size=args.cache_size,
+        cache_path=args.cache_path
+    )
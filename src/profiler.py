@@ -0,0 +1,148 @@
+"""
+훈련 처리량 프로파일러 (입력 파이프라인 병목 리포트)
+"""
+import os
+import json
+import time
+import numpy as np
+import tensorflow as tf
+
+from data_utils import augment_data, decode_and_resize
+
+def host_memory_mb():
+    """현재/최대 프로세스 메모리 (MB)"""
+    memory = {}
+    try:
+        import resource
+        # Linux는 KB 단위
+        memory['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    except ImportError:
+        pass
+
+    try:
+        with open('/proc/self/statm') as f:
+            rss_pages = int(f.read().split()[1])
+        memory['current_rss_mb'] = rss_pages * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    return memory
+
+class StepTimer(tf.keras.callbacks.Callback):
+    """훈련 스텝 시간 기록 (첫 스텝은 그래프 생성 시간이 포함되므로 제외)"""
+    def __init__(self, skip_steps=5):
+        super().__init__()
+        self.skip_steps = skip_steps
+        self.step_times = []
+        self._step = 0
+        self._start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._step += 1
+        if self._step > self.skip_steps:
+            self.step_times.append(time.perf_counter() - self._start)
+
+    def summary(self):
+        if not self.step_times:
+            return {}
+        step_time = float(np.median(self.step_times))
+        return {
+            'steps_measured': len(self.step_times),
+            'step_time_ms': step_time * 1000.0,
+            'steps_per_sec': 1.0 / step_time
+        }
+
+def _throughput(dataset, max_elements):
+    """데이터셋을 끝까지 읽는 데 걸린 시간 (초)"""
+    start = time.perf_counter()
+    for _ in dataset.take(max_elements):
+        pass
+    return time.perf_counter() - start
+
+def profile_input_stages(image_paths, img_size, batch_size, augmentation_mode=None, max_images=512):
+    """
+    입력 파이프라인 단계별 비용 측정
+    단계를 하나씩 누적한 파이프라인을 각각 실행하고, 이전 파이프라인과의 시간 차이를 해당 단계 비용으로 계산
+    """
+    paths = list(image_paths)[:max_images]
+    if not paths:
+        return {}
+
+    num_images = len(paths)
+    num_batches = (num_images + batch_size - 1) // batch_size
+    files = tf.data.Dataset.from_tensor_slices(paths)
+    parallel = dict(num_parallel_calls=tf.data.AUTOTUNE)
+
+    read = files.map(tf.io.read_file, **parallel)
+    # 훈련/추론과 같은 decode_and_resize 사용 (JPEG 축소 디코딩은 디코딩과 리사이즈를 나눠 측정할 수 없음)
+    decode_resize = read.map(lambda data: decode_and_resize(data, img_size), **parallel)
+    batch = decode_resize.batch(batch_size)
+
+    pipelines = [('read', read), ('decode_resize', decode_resize), ('batch', batch)]
+    if augmentation_mode and augmentation_mode != 'model':
+        augmented = augment_data(batch.map(lambda images: (images, 0)), mode=augmentation_mode)
+        pipelines.append(('augment', augmented))
+
+    # 파일 시스템 캐시를 데우기 위해 한 번 읽음
+    _throughput(read, num_images)
+
+    stages = {}
+    previous = 0.0
+    for name, dataset in pipelines:
+        elapsed = _throughput(dataset, num_images)
+        stages[name] = {
+            'total_sec': elapsed,
+            'stage_ms_per_image': max(0.0, elapsed - previous) * 1000.0 / num_images
+        }
+        previous = elapsed
+
+    stages['_num_images'] = num_images
+    stages['_num_batches'] = num_batches
+    return stages
+
+def measure_compute_step_time(model, dataset, num_steps=20):
+    """같은 배치를 반복해 입력 대기 없는 순수 모델 스텝 시간 측정 (초)"""
+    cached = dataset.take(1).cache().repeat()
+    model.fit(cached, steps_per_epoch=3, epochs=1, verbose=0)  # 워밍업
+    start = time.perf_counter()
+    model.fit(cached, steps_per_epoch=num_steps, epochs=1, verbose=0)
+    return (time.perf_counter() - start) / num_steps
+
+def write_profile_report(report_path, step_timer, stages, compute_step_time=None, log_dir=None):
+    """JSON 리포트 저장 및 요약 출력"""
+    steps = step_timer.summary()
+    report = {
+        'training': steps,
+        'input_stages': stages,
+        'host_memory': host_memory_mb(),
+        'tensorboard_log_dir': log_dir
+    }
+
+    if compute_step_time and steps:
+        step_time = steps['step_time_ms'] / 1000.0
+        report['compute_step_time_ms'] = compute_step_time * 1000.0
+        # 실제 스텝 시간 중 순수 연산 시간을 뺀 나머지를 입력 대기로 추정
+        report['input_wait_fraction'] = max(0.0, (step_time - compute_step_time) / step_time)
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n=== 훈련 프로파일 요약 ===")
+    if steps:
+        print(f"스텝 시간: {steps['step_time_ms']:.1f}ms ({steps['steps_per_sec']:.2f} steps/sec)")
+    if 'input_wait_fraction' in report:
+        print(f"순수 연산 스텝: {report['compute_step_time_ms']:.1f}ms, "
+              f"입력 대기 비율: {report['input_wait_fraction'] * 100:.1f}%")
+    for name, stage in stages.items():
+        if not name.startswith('_'):
+            print(f"  {name:<8}: {stage['stage_ms_per_image']:.2f}ms/이미지")
+    for name, value in report['host_memory'].items():
+        print(f"{name}: {value:.0f}MB")
+    if log_dir:
+        print(f"TensorBoard 트레이스: tensorboard --logdir {log_dir}")
+    print(f"리포트 저장됨: {report_path}")
+
+    return report
@@ -0,0 +1,128 @@
+"""
+입력 해상도 스윕 스크립트 (해상도별 정확도 vs 지연 시간/연산량)
+해상도마다 모델을 훈련하거나(--train), 훈련된 모델의 가중치를 다른 입력 크기로 옮겨 평가
+"""
+import os
+import json
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+
+from data_utils import DataLoader
+from model import MODEL_BUILDERS
+from train_model import CONFIG, compile_model, evaluate_model, train_model
+from benchmark_models import latency_percentiles
+
+def count_flops(model):
+    """단일 이미지 추론 부동소수점 연산 수 (측정할 수 없으면 None)"""
+    try:
+        from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2_as_graph
+
+        spec = tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32)
+        concrete = tf.function(lambda x: model(x, training=False)).get_concrete_function(spec)
+        frozen, _ = convert_variables_to_constants_v2_as_graph(concrete)
+        options = tf.compat.v1.profiler.ProfileOptionBuilder.float_operation()
+        options['output'] = 'none'
+        return int(tf.compat.v1.profiler.profile(graph=frozen.graph, options=options).total_float_ops)
+    except Exception as e:
+        print(f"  ⚠️ FLOPs 측정 실패: {e}")
+        return None
+
+def resize_model_input(model, img_size):
+    """
+    같은 가중치로 입력 크기만 바꾼 모델 생성
+    전역 풀링으로 끝나는 컨볼루션 모델은 입력 크기와 무관하게 가중치 모양이 같음
+    """
+    inputs = tf.keras.Input(shape=tuple(img_size) + (3,))
+    resized = tf.keras.models.clone_model(model, input_tensors=inputs)
+    resized.set_weights(model.get_weights())
+    return resized
+
+def measure_resolution(model, val_dataset, tag, output_dir, num_runs=100):
+    """evaluate_model 지표 + 지연 시간 + FLOPs (평가 결과 파일은 output_dir에 저장)"""
+    img_size = tuple(model.input_shape[1:3])
+    image = np.random.randint(0, 256, size=(1,) + img_size + (3,), dtype=np.uint8)
+
+    compile_model(model, jit_compile=False)
+    result = evaluate_model(model, val_dataset, tag, output_dir=output_dir)
+    result['latency'] = latency_percentiles(model.predict_on_batch, image, num_runs)
+    result['flops'] = count_flops(model)
+    result['params'] = model.count_params()
+    return result
+
+def run_sweep(img_sizes, model_path=None, train=False, model_type=None):
+    """
+    해상도별 결과 {크기: 결과}
+    train=True: 해상도마다 models/resolution_sweep/<크기>/에 모델을 새로 훈련
+    model_path: 훈련된 모델의 가중치를 각 해상도로 옮겨 재훈련 없이 평가
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_model_dir = CONFIG['model_dir']
+    source_model = tf.keras.models.load_model(model_path, compile=False) if model_path else None
+    if model_type:
+        CONFIG['model_type'] = model_type
+
+    results = {}
+    for size in img_sizes:
+        img_size = (size, size)
+        print(f"\n=== 해상도 {size}x{size} ===")
+        val_dataset = DataLoader(data_dir=CONFIG['data_dir'], img_size=img_size,
+                                 batch_size=CONFIG['batch_size']).create_dataset('validation')
+
+        # 해상도별 결과는 각자의 디렉토리에 저장 (서로 덮어쓰지 않도록)
+        size_dir = os.path.join(base_model_dir, 'resolution_sweep', str(size))
+        os.makedirs(size_dir, exist_ok=True)
+        if train:
+            CONFIG['img_size'] = img_size
+            CONFIG['model_dir'] = size_dir
+            try:
+                model, _ = train_model()
+            finally:
+                CONFIG['model_dir'] = base_model_dir
+            model_file = os.path.join(size_dir, 'best_model.h5')
+        else:
+            model = resize_model_input(source_model, img_size)
+            model_file = None
+
+        result = measure_resolution(model, val_dataset, f'resolution_{size}_{timestamp}', size_dir)
+        result['model_path'] = model_file
+        results[str(size)] = result
+        tf.keras.backend.clear_session()
+
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='입력 해상도 스윕 (정확도 vs 지연 시간)')
+    parser.add_argument('--img_sizes', type=int, nargs='+', default=[96, 128, 160, 192, 224], help='입력 크기 목록')
+    parser.add_argument('--train', action='store_true', help='해상도마다 모델을 새로 훈련')
+    parser.add_argument('--model_path', type=str, default=None, help='재훈련 없이 평가할 훈련된 모델')
+    parser.add_argument('--model_type', type=str, default=None, choices=list(MODEL_BUILDERS),
+                        help='--train 시 모델 타입 (CONFIG 값 덮어쓰기)')
+    parser.add_argument('--output', type=str, default='models/resolution_sweep.json', help='결과 저장 경로')
+
+    args = parser.parse_args()
+    if not args.train and not args.model_path:
+        parser.error('--train 또는 --model_path 중 하나가 필요합니다')
+
+    results = run_sweep(args.img_sizes, args.model_path, args.train, args.model_type)
+
+    print("\n=== 해상도별 결과 ===")
+    print(f"{'크기':>6}{'정확도':>10}{'F1':>8}{'p50(ms)':>10}{'GFLOPs':>10}")
+    for size, result in results.items():
+        flops = f"{result['flops'] / 1e9:.3f}" if result['flops'] else '-'
+        print(f"{size:>6}{result['val_accuracy']:>10.4f}{result['f1_score']:>8.4f}"
+              f"{result['latency']['p50_ms']:>10.2f}{flops:>10}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'date': datetime.now().isoformat(),
+            'mode': 'train' if args.train else 'transfer',
+            'model_path': args.model_path,
+            'results': results
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n결과 저장됨: {args.output}")
+    print("선택한 해상도로 배포: python src/train_model.py --img_size <크기> 후 convert_to_tfjs.py "
+          "(model_info.json의 img_size로 클라이언트가 리사이즈)")
@@ -0,0 +1,154 @@
+"""
+추론 결과 캐시 (이미지 내용 해시 + 모델 버전 → 점수)
+같은 파일이 다시 들어오면 디코딩과 model.predict를 모두 건너뜀
+메모리 LRU + 선택적 SQLite 디스크 저장, 모델이 바뀌면 이전 버전 결과는 자동 무효화
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+def model_version(model_path: str) -> str:
+    """모델 파일(또는 SavedModel 디렉토리) 내용 해시 - 같은 경로에 새 모델을 덮어써도 버전이 바뀜"""
+    digest = hashlib.sha256()
+    if os.path.isdir(model_path):
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(model_path)
+            for name in files
+        )
+    else:
+        paths = [model_path]
+
+    for path in paths:
+        digest.update(os.path.relpath(path, model_path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def content_hash(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+class ResultCache:
+    """
+    스레드 안전한 LRU 결과 캐시
+    disk_path 지정 시 메모리에서 밀려난 결과도 SQLite에서 찾고, 서버 재시작 후에도 유지
+    디스크 행은 (내용 해시, 모델 버전) 단위라 다른 모델을 쓰는 프로세스가 같은 파일을 공유해도 서로 덮어쓰지 않음
+    오래된 버전은 마지막 기록 후 max_age_days가 지나면 정리
+    """
+    SCHEMA_VERSION = 1
+
+    def __init__(self, model_version: str, max_entries: int = 10000, disk_path: Optional[str] = None,
+                 max_age_days: float = 30.0):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._db = None
+
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            # 서버 요청 스레드들이 공유하므로 잠금으로 직렬화
+            # 다른 프로세스가 쓰는 동안 잠시 기다림 (그래도 잠겨 있으면 호출 측에서 오류 처리)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, timeout=5.0)
+            if self._db.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                # 이전 형식(내용 해시만 기본 키)은 버전 간에 서로 덮어쓰므로 버리고 새로 만듦 (캐시라 재계산 가능)
+                self._db.execute('DROP TABLE IF EXISTS results')
+                self._db.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT NOT NULL, model_version TEXT NOT NULL, score REAL NOT NULL, created REAL NOT NULL, '
+                'PRIMARY KEY (key, model_version))'
+            )
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.set_model_version(model_version)
+
+    def set_model_version(self, version: str):
+        """
+        모델이 바뀌면 메모리 캐시를 비움 (디스크 조회도 새 버전 행만 사용)
+        디스크에서는 다른 프로세스가 아직 쓰고 있을 수 있는 버전은 남기고, 오래 기록이 없는 버전만 정리
+        """
+        with self._lock:
+            self.model_version = version
+            self._entries.clear()
+            if self._db is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._db.execute(
+                    'DELETE FROM results WHERE model_version IN ('
+                    'SELECT model_version FROM results GROUP BY model_version HAVING MAX(created) < ?)',
+                    (cutoff,)
+                )
+                self._db.commit()
+
+    def key(self, image_bytes: bytes) -> str:
+        return content_hash(image_bytes)
+
+    def get(self, key: str) -> Optional[float]:
+        """캐시된 점수 (없으면 None)"""
+        with self._lock:
+            score = self._entries.get(key)
+            if score is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return score
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT score FROM results WHERE key = ? AND model_version = ?',
+                    (key, self.model_version)
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, score: float):
+        self.put_many([(key, score)])
+
+    def put_many(self, items):
+        """(키, 점수) 여러 개를 한 번에 저장 (디스크 캐시는 커밋 한 번)"""
+        items = [(key, float(score)) for key, score in items]
+        with self._lock:
+            for key, score in items:
+                self._remember(key, score)
+            if self._db is not None and items:
+                now = time.time()
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    [(key, self.model_version, score, now) for key, score in items]
+                )
+                self._db.commit()
+
+    def _remember(self, key, score):
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'model_version': self.model_version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
@@ -2,122 +2,402 @@
 모델 훈련 스크립트
 """
 import os
+import random
+import shutil
+import tempfile
+import numpy as np
 import tensorflow as tf
 import matplotlib.pyplot as plt
 from datetime import datetime
 import json
 
-from data_utils import DataLoader, augment_data, visualize_samples
-from model import create_mobilenet_classifier, create_efficient_classifier, get_model_summary
+from data_utils import (DataLoader, augment_data, class_weights_from_counts, create_augmentation_layers,
+                        visualize_samples)
+from model import create_model, with_augmentation, get_model_summary
+from feature_cache import train_head_on_features
+from profiler import StepTimer, profile_input_stages, measure_compute_step_time, write_profile_report
 
 # 설정
 CONFIG = {
     'data_dir': 'data',
     'model_dir': 'models',
     'img_size': (224, 224),
-    'batch_size': 32,
+    'batch_size': 32,  # 복제본(워커)당 배치 크기, 전역 배치 = batch_size × 복제본 수
     'epochs': 50,
     'learning_rate': 0.001,
     'model_type': 'efficient',  # 'mobilenet', 'efficient', 'custom'
     'use_augmentation': True,
+    'augmentation_mode': 'pipeline',  # 'pipeline', 'model', 'vectorized'
+    'cache': None,  # None, 'memory', 'disk'
+    'tfrecord_dir': None,  # 예: 'data/tfrecords' (data_tools.py tfrecord로 생성)
+    'feature_cache': False,  # mobilenet 전용: 백본 특징을 캐시해 헤드를 먼저 훈련
+    'feature_cache_augment_repeats': 0,  # 헤드 훈련용으로 추가 생성할 증강 특징 횟수
+    'head_epochs': 30,  # 캐시된 특징으로 헤드를 훈련할 에폭 수
+    'fine_tune_epochs': 10,  # 헤드 훈련 후 상위 백본 레이어 미세 조정 에폭 수 (0이면 생략)
+    'distribution_strategy': None,  # None, 'mirrored'(단일 호스트), 'multi_worker'(TF_CONFIG 필요)
+    'jit_compile': False,  # XLA JIT 컴파일로 훈련 스텝 실행
+    'mixed_precision': None,  # None 또는 'mixed_bfloat16'(CPU), 'mixed_float16'(GPU)
+    'checkpoint_save_freq': 'epoch',  # 전체 상태 체크포인트 주기 ('epoch' 또는 스텝 수)
+    'incremental_epochs': 10,  # 기존 모델에서 이어서 훈련할 때의 에폭 수
+    'incremental_learning_rate': 1e-4,  # 기존 모델에서 이어서 훈련할 때의 학습률
+    'replay_ratio': 1.0,  # 새 이미지 수 대비 함께 훈련할 기존 이미지 비율
+    'seed': 42,
+    'profile_batches': (10, 20),  # --profile 시 TensorBoard 트레이스를 수집할 스텝 구간
     'early_stopping_patience': 10,
     'reduce_lr_patience': 5
 }
 
-def train_model():
-    """모델 훈련 메인 함수"""
+class BestModelCheckpoint(tf.keras.callbacks.Callback):
+    """
+    검증 손실이 개선될 때 추론용 모델 저장
+    훈련용 모델에 증강 레이어가 붙어 있어도 배포 모델만 저장됨
+    """
+    def __init__(self, export_model, filepath, monitor='val_loss', verbose=1):
+        super().__init__()
+        self.export_model = export_model
+        self.filepath = filepath
+        self.monitor = monitor
+        self.verbose = verbose
+        self.best = float('inf')
+    
+    def on_epoch_end(self, epoch, logs=None):
+        current = (logs or {}).get(self.monitor)
+        if current is None or current >= self.best:
+            return
+        
+        if self.verbose:
+            print(f"\nEpoch {epoch + 1}: {self.monitor} 개선 ({self.best:.5f} → {current:.5f}), "
+                  f"모델 저장: {self.filepath}")
+        self.best = current
+        self.export_model.save(self.filepath)
+
+class TrainingStateBackup(tf.keras.callbacks.Callback):
+    """
+    BackupAndRestore가 저장하지 않는 콜백 상태(조기 종료/학습률 감소 대기 횟수, 최고 기록)를
+    JSON으로 저장하고 재개 시 복원 - 콜백 목록의 마지막에 두어야 다른 콜백 초기화 이후에 복원됨
+    EarlyStopping(restore_best_weights)의 최고 가중치는 바뀔 때만 같은 디렉토리에 .npz로 저장
+    """
+    STATE_ATTRS = ('wait', 'best', 'best_epoch', 'cooldown_counter')
+    
+    def __init__(self, tracked_callbacks, state_path, write=True):
+        super().__init__()
+        self.tracked_callbacks = tracked_callbacks
+        self.state_path = state_path
+        # 분산 훈련에서는 공유 디렉토리에 대표 워커만 기록 (상태는 워커 간 동일)
+        self.write = write
+        self._saved_best_epochs = {}
+    
+    def _weights_path(self, callback):
+        return os.path.join(os.path.dirname(self.state_path), f'{type(callback).__name__}_best_weights.npz')
+    
+    def on_train_begin(self, logs=None):
+        if not os.path.exists(self.state_path):
+            return
+        
+        with open(self.state_path, encoding='utf-8') as f:
+            states = json.load(f)
+        for callback in self.tracked_callbacks:
+            for attr, value in states.get(type(callback).__name__, {}).items():
+                setattr(callback, attr, value)
+            
+            weights_path = self._weights_path(callback)
+            if hasattr(callback, 'best_weights') and os.path.exists(weights_path):
+                with np.load(weights_path) as data:
+                    callback.best_weights = [data[f'arr_{i}'] for i in range(len(data.files))]
+                self._saved_best_epochs[type(callback).__name__] = getattr(callback, 'best_epoch', None)
+        print(f"콜백 상태 복원됨: {self.state_path}")
+    
+    def on_epoch_end(self, epoch, logs=None):
+        if not self.write:
+            return
+        
+        states = {}
+        for callback in self.tracked_callbacks:
+            states[type(callback).__name__] = {
+                attr: float(getattr(callback, attr)) if attr == 'best' else int(getattr(callback, attr))
+                for attr in self.STATE_ATTRS if hasattr(callback, attr)
+            }
+        
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        for callback in self.tracked_callbacks:
+            name = type(callback).__name__
+            best_weights = getattr(callback, 'best_weights', None)
+            if best_weights is None or self._saved_best_epochs.get(name) == states[name].get('best_epoch'):
+                continue
+            # 중단 시 반쯤 쓰인 파일이 남지 않도록 임시 파일에 쓰고 교체
+            weights_path = self._weights_path(callback)
+            with open(weights_path + '.tmp', 'wb') as f:
+                np.savez(f, *best_weights)
+            os.replace(weights_path + '.tmp', weights_path)
+            self._saved_best_epochs[name] = states[name].get('best_epoch')
+        
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(states, f, indent=2)
+
+def select_incremental_files(data_loader, init_model_path, new_data_dir=None, replay_ratio=1.0, seed=42):
+    """
+    증분 훈련용 파일 선택: 새 이미지 + 기존 이미지 일부(replay)
+    new_data_dir가 없으면 기존 모델 파일보다 나중에 데이터셋 인덱스에 등록된 훈련 이미지를 새 이미지로 간주
+    (split의 복사/하드링크는 원본 mtime을 유지하므로 파일 mtime으로는 판별할 수 없음)
+    """
+    paths, labels = data_loader.collect_files('train')
+    
+    if new_data_dir:
+        new_paths, new_labels = DataLoader(new_data_dir).collect_files('train')
+        old_samples = list(zip(paths, labels))
+    else:
+        added = set(data_loader.dataset_index().added_since('train', os.path.getmtime(init_model_path)))
+        new_paths, new_labels, old_samples = [], [], []
+        for path, label in zip(paths, labels):
+            if path in added:
+                new_paths.append(path)
+                new_labels.append(label)
+            else:
+                old_samples.append((path, label))
+    
+    num_replay = min(len(old_samples), int(len(new_paths) * replay_ratio))
+    replay = random.Random(seed).sample(old_samples, num_replay)
+    
+    print(f"증분 훈련 데이터: 새 이미지 {len(new_paths)}장 + 기존 이미지 {num_replay}장")
+    return new_paths + [p for p, _ in replay], new_labels + [l for _, l in replay]
+
+def set_precision_policy(mixed_precision=None):
+    """혼합 정밀도 정책 설정 (모델 생성 전에 호출해야 함)"""
+    policy = mixed_precision or 'float32'
+    tf.keras.mixed_precision.set_global_policy(policy)
+    return policy
+
+def compile_model(model, jit_compile=None, learning_rate=None):
+    """모델 컴파일"""
+    jit_compile = CONFIG['jit_compile'] if jit_compile is None else jit_compile
+    if jit_compile and any(layer.name == 'augmentation' for layer in model.layers):
+        # 랜덤 회전/확대 레이어(ImageProjectiveTransformV3)는 XLA로 컴파일되지 않음
+        raise ValueError("'model' 증강 모드는 jit_compile과 함께 사용할 수 없습니다 (pipeline/vectorized 모드 사용)")
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate or CONFIG['learning_rate']),
+        loss='binary_crossentropy',
+        metrics=['accuracy', 'precision', 'recall'],
+        jit_compile=jit_compile
+    )
+
+def get_distribution_strategy(name=None):
+    """분산 훈련 전략 생성 (None이면 기본 단일 장치 전략)"""
+    if name is None:
+        return tf.distribute.get_strategy()
+    if name == 'mirrored':
+        return tf.distribute.MirroredStrategy()
+    if name == 'multi_worker':
+        # 클러스터 구성은 TF_CONFIG 환경 변수에서 읽음
+        return tf.distribute.MultiWorkerMirroredStrategy()
+    raise ValueError(f"지원하지 않는 분산 전략: {name}")
+
+def is_chief():
+    """결과 파일을 기록할 대표 워커인지 확인 (TF_CONFIG가 없으면 항상 True)"""
+    tf_config = json.loads(os.environ.get('TF_CONFIG', '{}'))
+    task = tf_config.get('task', {})
+    task_type = task.get('type')
+    if task_type is None:
+        return True
+    if 'chief' in tf_config.get('cluster', {}):
+        return task_type == 'chief'
+    return task_type == 'worker' and task.get('index', 0) == 0
+
+def train_model(resume=False, init_model=None, new_data_dir=None, profile=False):
+    """
+    모델 훈련 메인 함수
+    resume: 중단된 훈련을 마지막 체크포인트(가중치, 옵티마이저, 에폭/스텝, 콜백 상태)에서 재개
+    init_model: 기존 모델에서 시작해 새 이미지 + 기존 이미지 일부로 증분 훈련
+    profile: TensorBoard 프로파일러 트레이스와 입력 파이프라인 병목 리포트 생성
+    """
     print("=== 외국인등록증 뒷면 분류 모델 훈련 시작 ===")
     
+    # 분산 전략은 다른 TensorFlow 연산보다 먼저 생성해야 함
+    strategy = get_distribution_strategy(CONFIG['distribution_strategy'])
+    global_batch_size = CONFIG['batch_size'] * strategy.num_replicas_in_sync
+    chief = is_chief()
+    # 대표 워커가 아니면 모델/로그 출력은 임시 디렉토리에 저장 (모든 워커가 저장 연산에 참여해야 함)
+    # 체크포인트(backup_dir)는 재개를 위해 모든 워커가 공유 model_dir 아래 같은 경로 사용
+    model_dir = CONFIG['model_dir'] if chief else tempfile.mkdtemp(prefix='worker_')
+    print(f"복제본 수: {strategy.num_replicas_in_sync}, 전역 배치 크기: {global_batch_size}")
+    
     # 데이터 로더 생성
     print("데이터 로딩 중...")
     data_loader = DataLoader(
         data_dir=CONFIG['data_dir'],
         img_size=CONFIG['img_size'],
-        batch_size=CONFIG['batch_size']
+        batch_size=global_batch_size,
+        cache=CONFIG['cache'],
+        tfrecord_dir=CONFIG['tfrecord_dir'],
+        shuffle_seed=CONFIG['seed']
     )
     
     # 데이터셋 생성
-    train_dataset = data_loader.create_dataset('train')
+    if init_model:
+        if CONFIG['tfrecord_dir']:
+            raise ValueError("증분 훈련은 이미지 디렉토리 입력에서만 지원합니다")
+        train_paths, train_labels = select_incremental_files(
+            data_loader, init_model, new_data_dir, CONFIG['replay_ratio'], CONFIG['seed']
+        )
+        train_dataset = data_loader.create_dataset_from_files(train_paths, train_labels, split='incremental')
+    else:
+        train_dataset = data_loader.create_dataset('train')
     val_dataset = data_loader.create_dataset('validation')
     
     # 데이터 증강 적용 (훈련 데이터만)
-    if CONFIG['use_augmentation']:
-        print("데이터 증강 적용 중...")
-        train_dataset = augment_data(train_dataset)
+    augmentation_mode = CONFIG['augmentation_mode'] if CONFIG['use_augmentation'] else None
+    if augmentation_mode:
+        print(f"데이터 증강 적용 중... (모드: {augmentation_mode})")
+        train_dataset = augment_data(train_dataset, mode=augmentation_mode)
     
     # 클래스 가중치 계산
-    class_weights = data_loader.get_class_weights('train')
+    if init_model:
+        class_weights = class_weights_from_counts({c: train_labels.count(c) for c in (0, 1)})
+    else:
+        class_weights = data_loader.get_class_weights('train')
     print(f"클래스 가중치: {class_weights}")
     
     # 데이터셋 샘플 시각화
-    print("데이터셋 샘플 확인...")
-    visualize_samples(train_dataset)
-    
-    # 모델 생성
-    print(f"모델 생성 중... (타입: {CONFIG['model_type']})")
-    if CONFIG['model_type'] == 'mobilenet':
-        model = create_mobilenet_classifier(
-            input_shape=CONFIG['img_size'] + (3,),
-            num_classes=2
-        )
-    elif CONFIG['model_type'] == 'efficient':
-        model = create_efficient_classifier(
-            input_shape=CONFIG['img_size'] + (3,),
-            num_classes=2
-        )
-    else:
-        raise ValueError(f"지원하지 않는 모델 타입: {CONFIG['model_type']}")
+    if chief:
+        print("데이터셋 샘플 확인...")
+        visualize_samples(train_dataset)
+    
+    # 정밀도 정책 (출력 레이어는 항상 float32)
+    policy = set_precision_policy(CONFIG['mixed_precision'])
+    print(f"정밀도 정책: {policy}, XLA: {CONFIG['jit_compile']}")
+    
+    # 모델 생성/컴파일은 분산 전략 범위 안에서 수행 (변수가 복제본마다 생성됨)
+    with strategy.scope():
+        if init_model:
+            print(f"기존 모델에서 시작: {init_model}")
+            model = tf.keras.models.load_model(init_model, compile=False)
+        else:
+            print(f"모델 생성 중... (타입: {CONFIG['model_type']})")
+            model = create_model(
+                CONFIG['model_type'],
+                input_shape=CONFIG['img_size'] + (3,),
+                num_classes=2
+            )
+        
+        # 'model' 모드에서는 증강 레이어를 훈련용 모델에만 붙임
+        training_model = model
+        if augmentation_mode == 'model':
+            training_model = with_augmentation(model, create_augmentation_layers())
+        
+        # 모델 컴파일
+        learning_rate = CONFIG['incremental_learning_rate'] if init_model else None
+        compile_model(training_model, learning_rate=learning_rate)
+        if training_model is not model:
+            # 저장된 배포 모델도 바로 평가할 수 있도록 컴파일
+            compile_model(model, learning_rate=learning_rate)
     
     # 모델 요약
-    get_model_summary(model)
+    if chief:
+        get_model_summary(model)
     
-    # 모델 컴파일
-    model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=CONFIG['learning_rate']),
-        loss='binary_crossentropy',
-        metrics=['accuracy', 'precision', 'recall']
+    # 콜백 설정
+    early_stopping = tf.keras.callbacks.EarlyStopping(
+        monitor='val_loss',
+        patience=CONFIG['early_stopping_patience'],
+        restore_best_weights=True,
+        verbose=1
+    )
+    reduce_lr = tf.keras.callbacks.ReduceLROnPlateau(
+        monitor='val_loss',
+        factor=0.2,
+        patience=CONFIG['reduce_lr_patience'],
+        min_lr=1e-7,
+        verbose=1
+    )
+    best_checkpoint = BestModelCheckpoint(
+        export_model=model,
+        filepath=os.path.join(model_dir, 'best_model.h5'),
+        monitor='val_loss',
+        verbose=1
     )
     
-    # 콜백 설정
+    # 전체 상태 체크포인트 (가중치, 옵티마이저, 학습률, 에폭/스텝 위치) - 정상 종료 시 자동 삭제
+    # BackupAndRestore는 모든 워커가 같은 backup_dir을 써야 함 (대표 워커가 아닌 워커는 그 안의 임시 하위 디렉토리에 기록)
+    # 따라서 워커별 임시 model_dir이 아니라 공유 CONFIG['model_dir'] 기준으로 지정
+    backup_dir = os.path.join(CONFIG['model_dir'], 'checkpoints')
+    if not resume:
+        # 모든 워커가 첫 스텝(집합 연산) 이전에 지우므로 새 체크포인트와 겹치지 않음
+        shutil.rmtree(backup_dir, ignore_errors=True)
+    else:
+        print(f"체크포인트에서 재개: {backup_dir}")
+    
     callbacks = [
-        tf.keras.callbacks.EarlyStopping(
-            monitor='val_loss',
-            patience=CONFIG['early_stopping_patience'],
-            restore_best_weights=True,
-            verbose=1
-        ),
-        tf.keras.callbacks.ReduceLROnPlateau(
-            monitor='val_loss',
-            factor=0.2,
-            patience=CONFIG['reduce_lr_patience'],
-            min_lr=1e-7,
-            verbose=1
+        early_stopping,
+        reduce_lr,
+        best_checkpoint,
+        tf.keras.callbacks.BackupAndRestore(
+            backup_dir=backup_dir,
+            save_freq=CONFIG['checkpoint_save_freq']
         ),
-        tf.keras.callbacks.ModelCheckpoint(
-            filepath=os.path.join(CONFIG['model_dir'], 'best_model.h5'),
-            monitor='val_loss',
-            save_best_only=True,
-            verbose=1
+        TrainingStateBackup(
+            [early_stopping, reduce_lr, best_checkpoint],
+            os.path.join(backup_dir, 'callback_state.json'),
+            write=chief
         )
     ]
     
+    # 프로파일링: 지정 구간 TensorBoard 트레이스 + 스텝 시간 기록
+    step_timer = None
+    profile_log_dir = None
+    if profile:
+        step_timer = StepTimer()
+        profile_log_dir = os.path.join(model_dir, 'logs', datetime.now().strftime("profile_%Y%m%d_%H%M%S"))
+        callbacks += [
+            tf.keras.callbacks.TensorBoard(log_dir=profile_log_dir, profile_batch=CONFIG['profile_batches']),
+            step_timer
+        ]
+    
+    epochs = CONFIG['incremental_epochs'] if init_model else CONFIG['epochs']
+    history = None
+    if CONFIG['feature_cache']:
+        if CONFIG['model_type'] != 'mobilenet':
+            raise ValueError("feature_cache 모드는 mobilenet 모델에서만 지원합니다")
+        if CONFIG['distribution_strategy']:
+            raise ValueError("feature_cache 모드는 분산 훈련과 함께 사용할 수 없습니다")
+        
+        # 고정된 백본 특징으로 헤드를 먼저 훈련한 뒤, 훈련된 헤드에서 미세 조정을 이어감
+        history = train_head_on_features(
+            model,
+            data_loader,
+            compile_fn=compile_model,
+            epochs=CONFIG['head_epochs'],
+            class_weight=class_weights,
+            augment_repeats=CONFIG['feature_cache_augment_repeats'],
+            augmentation_mode=augmentation_mode or 'pipeline'
+        )
+        epochs = CONFIG['fine_tune_epochs']
+    
     # 모델 훈련
-    print("모델 훈련 시작...")
-    history = model.fit(
-        train_dataset,
-        validation_data=val_dataset,
-        epochs=CONFIG['epochs'],
-        callbacks=callbacks,
-        class_weight=class_weights,
-        verbose=1
-    )
+    if epochs > 0:
+        print("모델 훈련 시작...")
+        history = training_model.fit(
+            train_dataset,
+            validation_data=val_dataset,
+            epochs=epochs,
+            callbacks=callbacks,
+            class_weight=class_weights,
+            verbose=1
+        )
+    else:
+        # 헤드만 훈련한 경우 최종 모델을 best_model로도 저장
+        model.save(os.path.join(model_dir, 'best_model.h5'))
     
     # 훈련 결과 저장
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # 최종 모델 저장
-    final_model_path = os.path.join(CONFIG['model_dir'], f'foreigner_card_classifier_{timestamp}.h5')
+    final_model_path = os.path.join(model_dir, f'foreigner_card_classifier_{timestamp}.h5')
     model.save(final_model_path)
+    
+    if not chief:
+        # 대표 워커만 결과 파일을 남김
+        shutil.rmtree(model_dir, ignore_errors=True)
+        return model, history
+    
     print(f"최종 모델 저장됨: {final_model_path}")
     
     # 설정 및 히스토리 저장
@@ -139,6 +419,31 @@ def train_model():
     # 모델 평가
     evaluate_model(model, val_dataset, timestamp)
     
+    if profile:
+        print("=== 입력 파이프라인 프로파일링 ===")
+        stages = {}
+        if not CONFIG['tfrecord_dir']:
+            stages = profile_input_stages(
+                data_loader.collect_files('train')[0],
+                CONFIG['img_size'],
+                global_batch_size,
+                augmentation_mode
+            )
+        
+        # 훈련된 가중치를 건드리지 않도록 같은 구조의 복제본으로 순수 연산 시간 측정
+        with strategy.scope():
+            compute_model = tf.keras.models.clone_model(training_model)
+            compile_model(compute_model)
+        compute_step_time = measure_compute_step_time(compute_model, train_dataset)
+        
+        write_profile_report(
+            os.path.join(model_dir, f'profile_{timestamp}.json'),
+            step_timer,
+            stages,
+            compute_step_time,
+            profile_log_dir
+        )
+    
     print("=== 훈련 완료 ===")
     return model, history
 
@@ -182,8 +487,8 @@ def plot_training_history(history, timestamp):
     plt.savefig(os.path.join(CONFIG['model_dir'], f'training_history_{timestamp}.png'))
     plt.show()
 
-def evaluate_model(model, val_dataset, timestamp):
-    """모델 평가"""
+def evaluate_model(model, val_dataset, timestamp, output_dir=None):
+    """모델 평가 (결과는 output_dir, 기본값 CONFIG['model_dir']에 저장)"""
     print("=== 모델 평가 ===")
     
     # 검증 데이터에 대한 평가
@@ -207,9 +512,11 @@ def evaluate_model(model, val_dataset, timestamp):
     print(f"F1 스코어: {f1_score:.4f}")
     
     # 결과 저장
-    results_path = os.path.join(CONFIG['model_dir'], f'evaluation_results_{timestamp}.json')
+    results_path = os.path.join(output_dir or CONFIG['model_dir'], f'evaluation_results_{timestamp}.json')
     with open(results_path, 'w') as f:
         json.dump(results, f, indent=2)
+    
+    return results
 
 if __name__ == "__main__":
     # 모델 디렉토리 생성
@@ -227,5 +534,34 @@ if __name__ == "__main__":
     else:
         print("GPU 사용 불가, CPU로 훈련 진행")
     
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='모델 훈련')
+    parser.add_argument('--model_type', type=str, default=None, help='모델 타입 (CONFIG 값 덮어쓰기)')
+    parser.add_argument('--epochs', type=int, default=None, help='에폭 수 (CONFIG 값 덮어쓰기)')
+    parser.add_argument('--img_size', type=int, default=None,
+                        help='입력 이미지 크기 (CONFIG 값 덮어쓰기, resolution_sweep.py 결과로 선택)')
+    parser.add_argument('--distribution_strategy', type=str, default=None, choices=['mirrored', 'multi_worker'],
+                        help='분산 훈련 전략 (multi_worker는 TF_CONFIG 필요, launch_local_workers.py 참고)')
+    parser.add_argument('--resume', action='store_true', help='중단된 훈련을 마지막 체크포인트에서 재개')
+    parser.add_argument('--profile', action='store_true',
+                        help='TensorBoard 프로파일러 트레이스와 입력 파이프라인 병목 리포트(profile_*.json) 생성')
+    parser.add_argument('--init_model', type=str, default=None,
+                        help='기존 모델(models/*.h5)에서 시작해 새 이미지 + 기존 이미지 일부로 증분 훈련')
+    parser.add_argument('--new_data_dir', type=str, default=None,
+                        help='증분 훈련용 새 데이터 디렉토리 (train/ 구조), 없으면 모델 이후 수정된 이미지 사용')
+    
+    args = parser.parse_args()
+    for key in ('model_type', 'epochs', 'distribution_strategy'):
+        if getattr(args, key) is not None:
+            CONFIG[key] = getattr(args, key)
+    if args.img_size:
+        CONFIG['img_size'] = (args.img_size, args.img_size)
+    
     # 모델 훈련 실행
-    model, history = train_model()
+    model, history = train_model(
+        resume=args.resume,
+        init_model=args.init_model,
+        new_data_dir=args.new_data_dir,
+        profile=args.profile
+    )
@@ -0,0 +1,175 @@
+"""
+멀티 프로세스 CPU 추론 워커 풀
+모델을 TFLite 파일로 한 번 변환하고 각 워커가 메모리 맵으로 읽어 가중치를 읽기 전용으로 공유
+"""
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+def _worker_main(worker_id, tflite_path, intra_op_threads, inter_op_threads, task_queue, result_queue):
+    """워커 프로세스: 공유 큐에서 배치를 가져와 예측 (유휴 워커가 먼저 가져가므로 자동 부하 분산)"""
+    import tensorflow as tf
+
+    # 스레드 설정은 TensorFlow 연산이 실행되기 전에 지정해야 함
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+    from inference import TFLiteModel
+    model = TFLiteModel(tflite_path, num_threads=intra_op_threads)
+    result_queue.put(('ready', worker_id, None, 0.0))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        task_id, images = task
+        start = time.perf_counter()
+        try:
+            result = model.predict(images)
+        except Exception as e:
+            result = e
+        result_queue.put((task_id, worker_id, result, time.perf_counter() - start))
+
+class WorkerStats:
+    """워커별 처리량/지연 시간 통계 (결과 수신 스레드가 기록하고 /api/metrics 요청 스레드가 읽음)"""
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.images = 0
+        self.busy_time = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, num_images, latency):
+        with self._lock:
+            self.requests += 1
+            self.images += num_images
+            self.busy_time += latency
+            self.latencies.append(latency)
+
+    def summary(self):
+        # 기록 중인 deque를 순회하지 않도록 잠금 안에서 복사
+        with self._lock:
+            requests, images, busy_time = self.requests, self.images, self.busy_time
+            latencies = list(self.latencies)
+        latencies_ms = np.array(latencies) * 1000.0
+        has_data = len(latencies_ms) > 0
+        return {
+            'requests': requests,
+            'images': images,
+            'images_per_sec': images / busy_time if busy_time > 0 else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies_ms, 50)) if has_data else 0.0,
+            'latency_p95_ms': float(np.percentile(latencies_ms, 95)) if has_data else 0.0,
+        }
+
+class InferenceWorkerPool:
+    """
+    N개의 워커 프로세스로 배치 예측을 병렬 처리
+    각 워커는 intra_op_threads개 스레드를 사용 (기본값: CPU 코어를 워커 수로 균등 분할)
+    """
+    def __init__(self, model_path, num_workers=None, intra_op_threads=None, inter_op_threads=1):
+        from inference import export_tflite
+
+        cpu_count = os.cpu_count() or 1
+        self.num_workers = num_workers or max(1, cpu_count // 2)
+        self.intra_op_threads = intra_op_threads or max(1, cpu_count // self.num_workers)
+        self.inter_op_threads = inter_op_threads
+
+        # 변환은 부모 프로세스에서 한 번만 수행
+        self.tflite_path = export_tflite(model_path)
+
+        self._context = mp.get_context('spawn')
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        self._processes = []
+        self._pending = {}
+        self._pending_sizes = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self.stats = {i: WorkerStats() for i in range(self.num_workers)}
+
+    @property
+    def img_size(self):
+        from inference import TFLiteModel
+        return TFLiteModel(self.tflite_path, num_threads=1).img_size
+
+    def start(self, timeout=120.0):
+        for worker_id in range(self.num_workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(worker_id, self.tflite_path, self.intra_op_threads, self.inter_op_threads,
+                      self._task_queue, self._result_queue),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        # 모든 워커가 모델을 로드할 때까지 대기
+        for _ in range(self.num_workers):
+            self._result_queue.get(timeout=timeout)
+
+        self._dispatcher = threading.Thread(target=self._collect_results, name='worker-pool-results', daemon=True)
+        self._dispatcher.start()
+        print(f"✅ 추론 워커 {self.num_workers}개 시작 (워커당 스레드 {self.intra_op_threads}개)")
+        return self
+
+    def stop(self):
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+        self._processes = []
+        self._result_queue.put(None)
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+
+    def submit(self, images: np.ndarray) -> Future:
+        """배치를 큐에 넣고 예측 결과를 받을 Future 반환"""
+        future = Future()
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._pending[task_id] = future
+            self._pending_sizes[task_id] = len(images)
+        self._task_queue.put((task_id, images))
+        return future
+
+    def predict(self, images: np.ndarray, timeout: float = 60.0) -> np.ndarray:
+        return self.submit(images).result(timeout=timeout)
+
+    def _collect_results(self):
+        while True:
+            try:
+                message = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if message is None:
+                break
+
+            task_id, worker_id, result, latency = message
+            with self._lock:
+                future = self._pending.pop(task_id, None)
+                num_images = self._pending_sizes.pop(task_id, 0)
+            if future is None:
+                continue
+
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                self.stats[worker_id].record(num_images, latency)
+                future.set_result(result)
+
+    def get_metrics(self) -> dict:
+        return {
+            'num_workers': self.num_workers,
+            'intra_op_threads': self.intra_op_threads,
+            'pending': len(self._pending),
+            'workers': {worker_id: stats.summary() for worker_id, stats in self.stats.items()}
+        }
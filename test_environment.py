@@ -1,6 +1,10 @@
 """
 라이브러리 import 테스트 스크립트
 """
+import os
+import sys
+import shutil
+import tempfile
 
 def test_imports():
     """필수 라이브러리 import 테스트"""
@@ -69,6 +73,38 @@ def test_tensorflow_gpu():
     except Exception as e:
         print(f"❌ TensorFlow 테스트 실패: {e}")
 
+def test_cache_invalidation():
+    """디스크 캐시 키가 이미지 제자리 덮어쓰기(디렉토리 mtime 불변)에도 바뀌는지 확인"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+    from data_utils import DataLoader
+    
+    print("\n🗂️ 캐시 무효화 테스트:")
+    data_dir = tempfile.mkdtemp()
+    try:
+        class_dir = os.path.join(data_dir, 'train', 'foreigner_card_back')
+        os.makedirs(class_dir)
+        image_path = os.path.join(class_dir, 'card.png')
+        with open(image_path, 'wb') as f:
+            f.write(b'original')
+        
+        loader = DataLoader(data_dir, cache='disk')
+        paths, _ = loader.collect_files('train')
+        before = loader.cache_key(paths)
+        dir_mtime = os.stat(class_dir).st_mtime_ns
+        
+        # 같은 경로에 다른 내용으로 덮어쓰기
+        with open(image_path, 'wb') as f:
+            f.write(b'overwritten image')
+        stat = os.stat(image_path)
+        os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        os.utime(class_dir, ns=(dir_mtime, dir_mtime))
+        
+        paths, _ = loader.collect_files('train')
+        assert loader.cache_key(paths) != before, "덮어쓴 이미지에도 캐시 키가 그대로입니다 (오래된 캐시 사용)"
+        print("✅ 덮어쓴 이미지로 캐시 키 변경됨")
+    finally:
+        shutil.rmtree(data_dir)
+
 def test_project_structure():
     """프로젝트 구조 확인"""
     print("\n📁 프로젝트 구조 확인:")
@@ -91,8 +127,6 @@ def test_project_structure():
             print(f"❌ {dir_path} (누락)")
 
 if __name__ == "__main__":
-    import os
-    
     # 프로젝트 루트로 이동
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
@@ -100,6 +134,7 @@ if __name__ == "__main__":
     # 테스트 실행
     if test_imports():
         test_tensorflow_gpu()
+        test_cache_invalidation()
         test_project_structure()
         
         print("\n🚀 다음 단계:")
@@ -79,15 +79,25 @@ class ForeignerCardClassifier {
             // 모델 경로 확인 (상대 경로로 모델 파일 찾기)
             const modelUrl = './model.json';
             
+            // 변환 정보 (형식 등) 로드 - 없으면 layers 모델로 간주
+            this.modelInfo = await this.loadModelInfo();
+            
             this.showProgress('🤖 모델 다운로드 중...', 40);
             
             // 모델 로드
-            this.model = await tf.loadLayersModel(modelUrl);
+            if (this.modelInfo.format === 'graph') {
+                this.model = await tf.loadGraphModel(modelUrl);
+            } else {
+                this.model = await tf.loadLayersModel(modelUrl);
+            }
             
             this.showProgress('🤖 모델 초기화 중...', 80);
             
+            // 입력 크기: model_info.json → 모델 입력 형태 → 기본값 224 순으로 결정
+            this.imgSize = this.resolveImageSize();
+            
             // 모델 워밍업 (첫 번째 예측을 빠르게 하기 위해)
-            const dummyInput = tf.zeros([1, 224, 224, 3]);
+            const dummyInput = tf.zeros([1, ...this.imgSize, 3]);
             this.model.predict(dummyInput).dispose();
             dummyInput.dispose();
             
@@ -100,8 +110,11 @@ class ForeignerCardClassifier {
             }, 1000);
             
             console.log('모델 로딩 완료');
-            console.log('입력 형태:', this.model.inputs[0].shape);
+            console.log('입력 형태:', this.model.inputs[0].shape, '리사이즈 크기:', this.imgSize);
             console.log('출력 형태:', this.model.outputs[0].shape);
+            if (this.modelInfo.total_bytes) {
+                console.log(`모델 크기: ${(this.modelInfo.total_bytes / 1024 / 1024).toFixed(2)} MB`);
+            }
             
         } catch (error) {
             console.error('모델 로딩 실패:', error);
@@ -111,6 +124,29 @@ class ForeignerCardClassifier {
         }
     }
     
+    async loadModelInfo() {
+        try {
+            const response = await fetch('./model_info.json');
+            if (response.ok) {
+                return await response.json();
+            }
+        } catch (error) {
+            console.warn('model_info.json 로딩 실패:', error);
+        }
+        return { format: 'layers' };
+    }
+    
+    resolveImageSize() {
+        if (Array.isArray(this.modelInfo.img_size)) {
+            return this.modelInfo.img_size;
+        }
+        const shape = this.model.inputs && this.model.inputs[0].shape;
+        if (shape && shape[1] > 0 && shape[2] > 0) {
+            return [shape[1], shape[2]];
+        }
+        return [224, 224];
+    }
+    
     handleFileSelect(event) {
         const file = event.target.files[0];
         if (file) {
@@ -267,16 +303,12 @@ class ForeignerCardClassifier {
             // 이미지를 텐서로 변환
             let tensor = tf.browser.fromPixels(imgElement);
             
-            // 224x224로 리사이즈
-            tensor = tf.image.resizeBilinear(tensor, [224, 224]);
-            
-            // 배치 차원 추가 (1, 224, 224, 3)
-            tensor = tensor.expandDims(0);
-            
-            // 정규화 (0-1 범위)
-            tensor = tensor.div(255.0);
+            // 모델 입력 크기로 리사이즈
+            tensor = tf.image.resizeBilinear(tensor, this.imgSize);
             
-            return tensor;
+            // 배치 차원 추가 (1, 높이, 너비, 3)
+            // 0-255 범위 그대로 전달 (정규화는 모델 내부에서 수행)
+            return tensor.expandDims(0);
         });
     }
     
@@ -3,21 +3,189 @@
 """
 import os
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import json
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import webbrowser
 import threading
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # classifier.js와 동일한 10MB 제한
+
+# 서버 사이드 추론 모듈(src/) 경로 - TensorFlow는 모델을 지정한 경우에만 import
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'src'))
+
 class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
+    # 서버 사이드 추론 설정 (run_server에서 모델을 지정한 경우에만 사용)
+    batcher = None
+    worker_pool = None
+    cascade = None
+    result_cache = None
+    img_size = None
+    
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
+    
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.end_headers()
+    
+    def do_GET(self):
+        if self.path == '/api/metrics' and self.batcher is not None:
+            metrics = self.batcher.get_metrics()
+            if self.worker_pool is not None:
+                metrics['worker_pool'] = self.worker_pool.get_metrics()
+            if self.cascade is not None:
+                metrics['cascade'] = self.cascade.get_metrics()
+            if self.result_cache is not None:
+                metrics['result_cache'] = self.result_cache.get_metrics()
+            self.send_json(200, metrics)
+            return
+        super().do_GET()
+    
+    def do_POST(self):
+        """이미지 바이트(요청 본문 전체)를 받아 분류 결과 반환"""
+        if self.path != '/api/classify':
+            self.send_json(404, {'error': 'Not found'})
+            return
+        
+        if self.batcher is None:
+            self.send_json(503, {'error': '서버 사이드 모델이 로드되지 않았습니다 (--model_path 필요)'})
+            return
+        
+        length = int(self.headers.get('Content-Length', 0))
+        if length <= 0:
+            self.send_json(400, {'error': 'No image provided'})
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self.send_json(413, {'error': '파일 크기가 너무 큽니다 (10MB 이하)'})
+            return
+        
+        from inference import decode_image_bytes
+        from predict import make_result
+        
+        image_bytes = self.rfile.read(length)
+        
+        # 같은 파일이 다시 들어오면 디코딩/예측 없이 캐시된 결과 반환
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.key(image_bytes)
+            try:
+                score = self.result_cache.get(cache_key)
+            except Exception as e:
+                print(f"⚠️ 결과 캐시 조회 실패: {e}")
+                score = None
+            if score is not None:
+                result = make_result(None, score)
+                result.pop('path')
+                result['cached'] = True
+                self.send_json(200, result)
+                return
+        
+        try:
+            # 디코딩은 요청 스레드에서 병렬로 수행하고 모델 예측만 배치로 묶음
+            image = decode_image_bytes(image_bytes, self.img_size)
+        except Exception:
+            self.send_json(400, {'error': '이미지를 디코딩할 수 없습니다'})
+            return
+        
+        try:
+            score = self.batcher.predict(image)
+        except Exception as e:
+            self.send_json(500, {'error': f'추론 오류: {e}'})
+            return
+        
+        if cache_key is not None:
+            try:
+                self.result_cache.put(cache_key, score)
+            except Exception as e:
+                # 캐시 저장 실패(예: 다른 프로세스가 SQLite 파일을 잠금)는 응답에 영향을 주지 않음
+                print(f"⚠️ 결과 캐시 저장 실패: {e}")
+        
+        result = make_result(None, score)
+        result.pop('path')
+        self.send_json(200, result)
 
-def run_server(port=8000):
+def setup_inference(model_path, max_batch_size=32, max_wait_ms=10.0, workers=0, intra_op_threads=None,
+                    cache_size=10000, cache_path=None, cascade_config=None):
+    """
+    서버 사이드 추론용 모델과 마이크로 배처 준비 (workers > 0이면 멀티 프로세스 워커 풀 사용)
+    cache_size > 0이면 이미지 내용 해시 결과 캐시 사용 (모델 파일 내용이 바뀌면 이전 결과 무효화)
+    cascade_config: 지정 시 model_path 대신 캐스케이드(작은 모델 → 애매한 경우만 큰 모델)로 예측
+    """
+    from inference import load_classifier, MicroBatcher
+    from result_cache import ResultCache, model_version
+    
+    version_paths = [model_path]
+    if cascade_config:
+        if workers > 0:
+            raise ValueError("캐스케이드는 단일 프로세스 추론에서만 지원합니다 (--workers 0)")
+        from cascade import CascadeClassifier
+        
+        print(f"🤖 캐스케이드 로딩 중: {cascade_config}")
+        cascade = CascadeClassifier.from_config(cascade_config)
+        img_size = cascade.img_size
+        batcher = MicroBatcher(
+            cascade.predict,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        ).start()
+        CORSHTTPRequestHandler.cascade = cascade
+        version_paths = [cascade_config, cascade.small_model_path, cascade.large_model_path]
+    elif workers > 0:
+        print(f"🤖 서버 사이드 모델 로딩 중: {model_path}")
+        from worker_pool import InferenceWorkerPool
+        
+        pool = InferenceWorkerPool(model_path, num_workers=workers, intra_op_threads=intra_op_threads).start()
+        img_size = pool.img_size
+        # 워커 수만큼 배치를 동시에 보내 모든 워커가 일하도록 함
+        batcher = MicroBatcher(
+            pool.predict,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            num_threads=workers
+        ).start()
+        CORSHTTPRequestHandler.worker_pool = pool
+    else:
+        print(f"🤖 서버 사이드 모델 로딩 중: {model_path}")
+        model, img_size = load_classifier(model_path)
+        batcher = MicroBatcher(
+            model.predict_on_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        ).start()
+    
+    CORSHTTPRequestHandler.batcher = batcher
+    CORSHTTPRequestHandler.img_size = img_size
+    if cache_size > 0:
+        version = '-'.join(model_version(path) for path in version_paths)
+        CORSHTTPRequestHandler.result_cache = ResultCache(version, cache_size, cache_path)
+        print(f"🗂️ 결과 캐시: 최대 {cache_size}개" + (f", 디스크 {cache_path}" if cache_path else ""))
+    print(f"✅ 추론 엔드포인트 준비: POST /api/classify (배치 최대 {max_batch_size}, 대기 {max_wait_ms}ms)")
+    return batcher
+
+def run_server(port=8000, model_path=None, max_batch_size=32, max_wait_ms=10.0, workers=0, intra_op_threads=None,
+               cache_size=10000, cache_path=None, cascade_config=None):
     """웹 서버 실행"""
+    if model_path or cascade_config:
+        # 작업 디렉토리 변경 전에 모델 로드
+        setup_inference(os.path.abspath(model_path) if model_path else None, max_batch_size, max_wait_ms,
+                        workers, intra_op_threads, cache_size,
+                        os.path.abspath(cache_path) if cache_path else None,
+                        os.path.abspath(cascade_config) if cascade_config else None)
+    
     # web_demo 디렉토리로 이동
-    web_demo_dir = os.path.join(os.path.dirname(__file__), 'web_demo')
+    web_demo_dir = os.path.dirname(os.path.abspath(__file__))
     if os.path.exists(web_demo_dir):
         os.chdir(web_demo_dir)
     else:
@@ -44,7 +212,8 @@ def run_server(port=8000):
     
     try:
         # HTTP 서버 시작
-        server = HTTPServer(('localhost', port), CORSHTTPRequestHandler)
+        # 요청마다 스레드를 사용해 동시 요청이 마이크로 배치로 묶일 수 있도록 함
+        server = ThreadingHTTPServer(('localhost', port), CORSHTTPRequestHandler)
         url = f"http://localhost:{port}"
         
         print(f"🚀 웹 데모 서버 시작됨: {url}")
@@ -78,8 +247,18 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description='웹 데모 서버 실행')
     parser.add_argument('--port', type=int, default=8000, help='서버 포트 (기본값: 8000)')
+    parser.add_argument('--model_path', type=str, default=None, help='서버 사이드 추론용 Keras 모델 경로 (선택)')
+    parser.add_argument('--max_batch_size', type=int, default=32, help='마이크로 배치 최대 크기')
+    parser.add_argument('--max_wait_ms', type=float, default=10.0, help='마이크로 배치 최대 대기 시간 (ms)')
+    parser.add_argument('--workers', type=int, default=0, help='추론 워커 프로세스 수 (0: 단일 프로세스)')
+    parser.add_argument('--intra_op_threads', type=int, default=None, help='워커당 연산 스레드 수 (기본값: 코어 수 / 워커 수)')
+    parser.add_argument('--cache_size', type=int, default=10000, help='결과 캐시 최대 항목 수 (0: 사용 안 함)')
+    parser.add_argument('--cache_path', type=str, default=None, help='결과 캐시 SQLite 파일 (지정 시 재시작 후에도 유지)')
+    parser.add_argument('--cascade_config', type=str, default=None,
+                        help='캐스케이드 설정 (src/cascade.py로 생성, 지정 시 --model_path 대신 사용)')
     
     args = parser.parse_args()
     
     print("=== 외국인등록증 뒷면 분류기 웹 데모 ===")
-    run_server(args.port)
+    run_server(args.port, args.model_path, args.max_batch_size, args.max_wait_ms,
+               args.workers, args.intra_op_threads, args.cache_size, args.cache_path, args.cascade_config)